@@ -1,70 +1,459 @@
-from collections import defaultdict
-from random import randint
+from argparse import ArgumentParser, Namespace
+from itertools import count
+from random import Random
+from sys import getallocatedblocks
 from timeit import default_timer as timer
-from typing import DefaultDict
+from typing import Dict, List, Optional, Tuple
 
+from checkpoint import Checkpoint, load_checkpoint, save_checkpoint
 from constants import (
+    CHECKPOINT_INTERVAL,
     CROSSOVER_RATE,
+    FITNESS_CACHE_SIZE,
     GENERATIONS,
+    ISLANDS,
+    LOCAL_SEARCH,
+    MEMETIC_OFFSPRING,
+    MAX_EVALUATIONS,
     MUTATION_RATE,
     POPULATION_SIZE,
+    SELECTION,
     STAGNANCY_THRESHOLD,
+    TARGET_CONFLICTS,
+    TARGET_FITNESS,
+    TIME_BUDGET,
+    TOURNAMENT_SELECTION_SIZE,
+    WORKERS,
 )
 from data import load_data, sort_and_display
-from genetic_alg import EvolutionManager, Population
-from schedule import ScheduleOptimizer
+from fitness_cache import FitnessCache
+from genetic_alg import EvolutionManager, Population, SchedFactory, SchedulePool
+from islands import IslandModel
+from local_search import LocalSearch, create_local_search
+from metrics import Metrics, gene_diversity
+from nsga2 import NSGA2Manager
+from parallel import ParallelEvolutionManager
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer, hard_conflicts
+from selection import Selection, create_selection
+from stopping import RunController
 
 
-def schedule_factory() -> ScheduleOptimizer:
-    return load_data()
+def parse_args() -> Namespace:
+    parser = ArgumentParser(
+        description="Generate a timetable with a genetic algorithm."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="worker processes used to create and score offspring (1 runs serially)",
+    )
+    parser.add_argument(
+        "--islands",
+        type=int,
+        default=ISLANDS,
+        help="independent populations evolved in parallel with migration (1 disables)",
+    )
+    parser.add_argument(
+        "--memetic",
+        type=int,
+        default=MEMETIC_OFFSPRING,
+        help="best offspring improved by local search every generation (0 disables)",
+    )
+    parser.add_argument(
+        "--local-search",
+        choices=("tabu", "annealing"),
+        default=LOCAL_SEARCH,
+        help="local search used by the memetic mode",
+    )
+    parser.add_argument(
+        "--selection",
+        choices=("tournament", "roulette", "rank", "sus"),
+        default=None,
+        help=f"how parents are selected (sus: stochastic universal sampling); "
+        f"{SELECTION} by default, a binary crowded tournament with --nsga2",
+    )
+    parser.add_argument(
+        "--tournament-size",
+        type=int,
+        default=None,
+        help=f"schedules competing in each tournament of tournament selection "
+        f"({TOURNAMENT_SELECTION_SIZE} by default, 2 with --nsga2)",
+    )
+    parser.add_argument(
+        "--fitness-cache",
+        type=int,
+        default=FITNESS_CACHE_SIZE,
+        help="repaired offspring remembered, serial runs only (0 disables)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=TIME_BUDGET,
+        help="seconds after which evolution stops",
+    )
+    parser.add_argument(
+        "--target-fitness",
+        type=float,
+        default=TARGET_FITNESS,
+        help="fitness at which evolution stops (1.0: no conflicts nor penalties)",
+    )
+    parser.add_argument(
+        "--target-conflicts",
+        type=int,
+        default=TARGET_CONFLICTS,
+        help="hard conflicts at which evolution stops (0: feasible; -1 disables)",
+    )
+    parser.add_argument(
+        "--stagnancy",
+        type=int,
+        default=STAGNANCY_THRESHOLD,
+        help="consecutive generations without improvement after which evolution stops",
+    )
+    parser.add_argument(
+        "--max-evaluations",
+        type=int,
+        default=MAX_EVALUATIONS,
+        help="schedules evaluated after which evolution stops",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="file the population is saved to every --checkpoint-interval generations",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=CHECKPOINT_INTERVAL,
+        help="generations between two checkpoints",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        help="checkpoint file to continue a run from (with the same settings)",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="file receiving per-generation metrics as JSON lines",
+    )
+    parser.add_argument(
+        "--nsga2",
+        action="store_true",
+        help="trade the objectives of NSGA2_OBJECTIVES off with NSGA-II (serial runs)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="seed for a reproducible run"
+    )
+    return parser.parse_args()
+
+
+def create_evolution_manager(
+    problem: ProblemInstance,
+    workers: int,
+    local_search: Optional[LocalSearch],
+    rng: Random,
+    metrics: Metrics,
+    fitness_cache: Optional[FitnessCache] = None,
+    selection: Optional[Selection] = None,
+    nsga2: bool = False,
+) -> EvolutionManager:
+    if nsga2:
+        return NSGA2Manager(
+            problem,
+            mutation_rate=MUTATION_RATE,
+            crossover_rate=CROSSOVER_RATE,
+            local_search=local_search,
+            rng=rng,
+            metrics=metrics,
+            fitness_cache=fitness_cache,
+            selection=selection,
+        )
+    if workers > 1:
+        return ParallelEvolutionManager(
+            problem,
+            mutation_rate=MUTATION_RATE,
+            crossover_rate=CROSSOVER_RATE,
+            workers=workers,
+            local_search=local_search,
+            rng=rng,
+            metrics=metrics,
+            selection=selection,
+        )
+    return EvolutionManager(
+        mutation_rate=MUTATION_RATE,
+        crossover_rate=CROSSOVER_RATE,
+        local_search=local_search,
+        rng=rng,
+        metrics=metrics,
+        fitness_cache=fitness_cache,
+        selection=selection,
+    )
 
 
 def main() -> None:
-    initial_population: Population = Population(
-        size=POPULATION_SIZE, schedule_factory=schedule_factory
+    args: Namespace = parse_args()
+    # The single random stream of the run; every random choice is drawn from it.
+    rng: Random = Random(args.seed)
+
+    if args.islands > 1 and (args.checkpoint or args.resume):
+        raise ValueError("Checkpoints are not supported by the island model")
+    if args.islands > 1 and args.metrics:
+        raise ValueError("Metrics are not supported by the island model")
+    if args.nsga2 and (args.workers > 1 or args.islands > 1):
+        raise ValueError("NSGA-II runs serially")
+
+    problem: ProblemInstance = load_data(rng=rng)
+    resume_from: Optional[Checkpoint] = (
+        load_checkpoint(args.resume, problem, rng) if args.resume else None
     )
-    print("Initialized population successfully")
-    evolution_manager: EvolutionManager = EvolutionManager(
-        mutation_rate=MUTATION_RATE, crossover_rate=CROSSOVER_RATE
+    local_search: Optional[LocalSearch] = (
+        create_local_search(args.local_search, args.memetic)
+        if args.memetic > 0
+        else None
+    )
+    # NSGA-II falls back to its binary crowded tournament unless told otherwise.
+    selection: Optional[Selection] = (
+        None
+        if args.nsga2 and args.selection is None and args.tournament_size is None
+        else create_selection(
+            SELECTION if args.selection is None else args.selection,
+            (
+                TOURNAMENT_SELECTION_SIZE
+                if args.tournament_size is None
+                else args.tournament_size
+            ),
+        )
+    )
+    run_controller = RunController(
+        generations=GENERATIONS,
+        time_budget=args.time_budget,
+        target_fitness=args.target_fitness,
+        target_conflicts=(
+            args.target_conflicts
+            if args.target_conflicts is not None and args.target_conflicts >= 0
+            else None
+        ),
+        stagnancy_threshold=args.stagnancy,
+        max_evaluations=args.max_evaluations,
     )
 
-    initial_population.evaulaute_fitness()
-    current_population: Population = initial_population
+    metrics = Metrics(open(args.metrics, "w") if args.metrics else None)
+    fitness_cache: Optional[FitnessCache] = (
+        FitnessCache(args.fitness_cache) if args.fitness_cache > 0 else None
+    )
 
-    fitness_counts: DefaultDict[float, int] = defaultdict(int)
+    def schedule_factory() -> ScheduleOptimizer:
+        return ScheduleOptimizer(problem, rng)
+
+    best_schedule: ScheduleOptimizer
+    if args.islands > 1:
+        with IslandModel(
+            problem,
+            mutation_rate=MUTATION_RATE,
+            crossover_rate=CROSSOVER_RATE,
+            islands=args.islands,
+            local_search=local_search,
+            rng=rng,
+            selection=selection,
+        ) as island_model:
+            best_schedule = island_model.run(run_controller)
+    else:
+        with create_evolution_manager(
+            problem,
+            args.workers,
+            local_search,
+            rng,
+            metrics,
+            fitness_cache,
+            selection,
+            args.nsga2,
+        ) as evolution_manager:
+            best_schedule = evolve(
+                evolution_manager,
+                schedule_factory,
+                run_controller,
+                checkpoint_path=args.checkpoint,
+                checkpoint_interval=args.checkpoint_interval,
+                resume_from=resume_from,
+                metrics=metrics,
+            )
+        metrics.close()
+        if isinstance(evolution_manager, NSGA2Manager):
+            print_front(evolution_manager)
+
+    print(
+        "Best Schedule Found!",
+        f"Fitness: {best_schedule.fitness:.6f}",
+        f"Conflicts: {sum(best_schedule.conflict_breakdown().values())}",
+        f"Soft penalty: {sum(best_schedule.penalty_breakdown().values())}",
+        sort_and_display(best_schedule),
+        sep="\n",
+    )
 
-    for gen in range(GENERATIONS):
-        start: float = timer()
 
+def evolve(
+    evolution_manager: EvolutionManager,
+    schedule_factory: SchedFactory,
+    run_controller: RunController,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    resume_from: Optional[Checkpoint] = None,
+    metrics: Optional[Metrics] = None,
+) -> ScheduleOptimizer:
+    metrics = metrics or Metrics()
+    current_population: Population
+    first_generation: int = 0
+    if resume_from is None:
+        run_controller.start()
+        current_population = Population(
+            size=POPULATION_SIZE,
+            schedule_factory=schedule_factory,
+            schedules=evolution_manager.spawn(POPULATION_SIZE, schedule_factory),
+        )
+        run_controller.add_evaluations(POPULATION_SIZE)
+        print("Initialized population successfully")
+        current_population.evaulaute_fitness()
+    else:
+        first_generation = resume_from.generation
+        current_population = Population(
+            size=len(resume_from.schedules),
+            schedule_factory=schedule_factory,
+            schedules=resume_from.schedules,
+        )
+        run_controller.restore(
+            resume_from.evaluations,
+            resume_from.best_fitness,
+            resume_from.improved_at,
+            resume_from.elapsed,
+        )
+        evolution_manager.rng.setstate(resume_from.random_state)
+        if evolution_manager.fitness_cache is not None:
+            for key, genome in resume_from.cache_entries:
+                evolution_manager.fitness_cache.put(key, genome)
+        print(f"Resumed from generation {first_generation}")
+
+    for gen in count(first_generation):
+        if (
+            checkpoint_path
+            and gen > first_generation
+            and gen % checkpoint_interval == 0
+        ):
+            save_checkpoint(
+                checkpoint_path,
+                gen,
+                current_population.schedules,
+                run_controller,
+                evolution_manager.rng,
+                evolution_manager.fitness_cache,
+            )
+
+        start: float = timer()
+        evaluations: int = run_controller.evaluations
+        blocks: int = getallocatedblocks() if metrics.enabled else 0
         if gen % 15 == 0:
-            current_population.schedules.extend(
-                [schedule_factory().create_schedule() for _ in range(randint(10, 21))]
+            immigrants: SchedulePool = evolution_manager.spawn(
+                evolution_manager.rng.randint(10, 21), schedule_factory
             )
+            current_population.replace_worst(immigrants)
+            run_controller.add_evaluations(len(immigrants))
         best_fitness: float = current_population.get_best_schedule().fitness
-        fitness_counts[best_fitness] += 1
-        if fitness_counts[best_fitness] > STAGNANCY_THRESHOLD:
-            print("Stagnancy Threshold exceeded. Stopping evolution")
+        if run_controller.should_stop(gen, best_fitness):
+            print(f"{run_controller.stop_reason} reached. Stopping evolution")
             break
 
+        current_population = evolution_manager.evolve(
+            current_population, schedule_factory
+        )
+        run_controller.add_evaluations(len(current_population.schedules) - 1)
+        elapsed: float = timer() - start
+
         print(
             f"Generation {gen} -",
-            f"Best Fitness: {best_fitness * 100:.3f} -",
-            f" Took {timer() - start:.6f} seconds",
+            f"Best Fitness: {best_fitness:.6f}",
+            f"({hard_conflicts(best_fitness)} conflicts) -",
+            f" Took {elapsed:.6f} seconds",
             sep=" ",
         )
+        if metrics.enabled:
+            emit_generation(
+                metrics,
+                gen,
+                elapsed,
+                run_controller.evaluations - evaluations,
+                getallocatedblocks() - blocks,
+                evolution_manager,
+                current_population,
+            )
 
-        current_population = evolution_manager.evolve(
-            current_population, schedule_factory
+    if metrics.enabled:
+        metrics.emit(
+            "run",
+            stop_reason=run_controller.stop_reason,
+            generations=gen,
+            evaluations=run_controller.evaluations,
+            seconds=run_controller.elapsed,
+            best_fitness=run_controller.best_fitness,
+            **cache_fields(evolution_manager.fitness_cache),
         )
+    return current_population.get_best_schedule()
 
-    best_schedule: ScheduleOptimizer = current_population.get_best_schedule()
 
+def print_front(nsga2_manager: NSGA2Manager) -> None:
+    """Prints the distinct objective vectors of the last Pareto front."""
+    names: Tuple[str, ...] = nsga2_manager.objectives.names
+    vectors: List[Tuple[int, ...]] = sorted(
+        set(map(tuple, nsga2_manager.front_objectives.tolist()))
+    )
     print(
-        "Best Schedule Found!",
-        f"Fitness: {best_schedule.fitness * 100:.3f}%",
-        sort_and_display(best_schedule),
-        sep="\n",
+        f"Pareto front: {len(nsga2_manager.front)} schedules, {len(vectors)} distinct"
     )
+    print(" | ".join(names))
+    for vector in vectors:
+        print(" | ".join(f"{value:>{len(name)}}" for name, value in zip(names, vector)))
+
+
+def emit_generation(
+    metrics: Metrics,
+    generation: int,
+    elapsed: float,
+    evaluations: int,
+    net_live_blocks: int,
+    evolution_manager: EvolutionManager,
+    population: Population,
+) -> None:
+    """
+    Reports one generation. `net_live_blocks` is the change in live memory blocks over
+    the generation: blocks freed again within it cancel out, so it shows growth rather
+    than how many allocations were made.
+    """
+    best_schedule: ScheduleOptimizer = population.get_best_schedule()
+    metrics.emit(
+        "generation",
+        generation=generation,
+        seconds=elapsed,
+        phases=evolution_manager.phase_times,
+        evaluations=evaluations,
+        evaluations_per_second=evaluations / elapsed if elapsed > 0.0 else None,
+        net_live_blocks=net_live_blocks,
+        best_fitness=best_schedule.fitness,
+        conflicts=best_schedule.conflict_breakdown(),
+        penalties=best_schedule.penalty_breakdown(),
+        diversity=gene_diversity(population.schedules),
+        **cache_fields(evolution_manager.fitness_cache),
+    )
+
+
+def cache_fields(fitness_cache: Optional[FitnessCache]) -> Dict[str, int]:
+    """Running fitness cache counters, none when the cache is disabled."""
+    if fitness_cache is None:
+        return {}
+    return {
+        "cache_hits": fitness_cache.hits,
+        "cache_misses": fitness_cache.misses,
+        "cache_size": len(fitness_cache),
+    }
 
 
 if __name__ == "__main__":
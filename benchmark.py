@@ -0,0 +1,255 @@
+import json
+import os
+import platform
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timedelta
+from random import Random
+from statistics import mean
+from tempfile import NamedTemporaryFile
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from constants import (
+    CROSSOVER_RATE,
+    MUTATION_RATE,
+    UNIVERSITY_END_TIME,
+    UNIVERSITY_START_TIME,
+)
+from data import load_data
+from evaluation import batch_evaluator
+from genetic_alg import EvolutionManager, Population
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer, hard_conflicts, is_feasible
+
+# Type Aliases
+Instance = Dict[str, Any]
+Result = Dict[str, Any]
+Progress = Dict[str, Any]
+
+# Size of a 1x instance, close to `input.json`.
+BASE_ROOMS: int = 10
+BASE_LAB_ROOMS: int = 5
+BASE_PROFESSORS: int = 15
+BASE_DEPARTMENTS: int = 2
+COURSES_PER_DEPARTMENT: int = 5
+DIVISIONS: int = 4
+BATCHES_PER_DIVISION: int = 2
+
+# Availability windows start and end on a quarter hour and last at least an hour.
+WINDOW_STEP: timedelta = timedelta(minutes=15)
+MIN_WINDOW: timedelta = timedelta(hours=1)
+
+
+def generate_instance(scale: int, tightness: float, rng: Random) -> Instance:
+    """
+    Generates a synthetic problem in the format of `input.json`.
+
+    Rooms, lab rooms, professors and departments grow linearly with `scale`, so the
+    number of sessions does too; the divisions every department is scheduled for
+    stay fixed. Every professor is available for a single window covering a fraction
+    `1 - tightness` of the teaching day, placed at random.
+
+    Raises:
+        ValueError: If scale is not positive or tightness is not in [0, 1).
+    """
+    if not scale > 0:
+        raise ValueError("Expected a positive scale")
+    if not 0.0 <= tightness < 1.0:
+        raise ValueError("Expected a tightness in [0, 1)")
+
+    day: timedelta = UNIVERSITY_END_TIME - UNIVERSITY_START_TIME
+    steps: int = day // WINDOW_STEP
+    window_steps: int = max(MIN_WINDOW // WINDOW_STEP, round(steps * (1.0 - tightness)))
+
+    def window() -> Dict[str, str]:
+        start: datetime = UNIVERSITY_START_TIME + WINDOW_STEP * rng.randint(
+            0, steps - window_steps
+        )
+        end: datetime = start + WINDOW_STEP * window_steps
+        return {"start": f"{start:%H:%M}", "end": f"{end:%H:%M}"}
+
+    return {
+        "rooms": [{"room_number": f"R{i}"} for i in range(BASE_ROOMS * scale)],
+        "lab_rooms": [{"room_number": f"L{i}"} for i in range(BASE_LAB_ROOMS * scale)],
+        "professors": [
+            {"name": f"Professor {i}", "available": window()}
+            for i in range(BASE_PROFESSORS * scale)
+        ],
+        "departments": [
+            {
+                "department_name": f"Department {d}",
+                "offered_courses": [
+                    {
+                        "title": f"Course {d}.{c}",
+                        "weekly_lectures": rng.randint(2, 3),
+                        "weekly_labs": rng.choice((0, 0, 1)),
+                    }
+                    for c in range(COURSES_PER_DEPARTMENT)
+                ],
+            }
+            for d in range(BASE_DEPARTMENTS * scale)
+        ],
+        "divisions": [
+            {"name": chr(ord("A") + i), "num_batches": BATCHES_PER_DIVISION}
+            for i in range(DIVISIONS)
+        ],
+    }
+
+
+def run_benchmark(
+    scale: int,
+    tightness: float,
+    population_size: int,
+    generations: int,
+    seed: int,
+) -> Result:
+    """
+    Times every stage of a run on a generated instance and returns the measurements.
+
+    Times are in seconds. `time_to_feasible` (and `generations_to_feasible`) is null
+    when no conflict-free schedule was found within `generations` generations, as is
+    usual on these instances: like `input.json`, they overload a few professors and lab
+    rooms. `best_conflicts` therefore tracks the hard conflicts of the best schedule
+    after initialization and after every generation, with the run time elapsed by then.
+    """
+    rng: Random = Random(seed)
+    instance: Instance = generate_instance(scale, tightness, rng)
+    with NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+        json.dump(instance, file)
+    try:
+        start: float = timer()
+        problem: ProblemInstance = load_data(file.name, rng)
+        load_time: float = timer() - start
+    finally:
+        os.remove(file.name)
+
+    def schedule_factory() -> ScheduleOptimizer:
+        return ScheduleOptimizer(problem, rng)
+
+    manager = EvolutionManager(MUTATION_RATE, CROSSOVER_RATE, rng=rng)
+    start = timer()
+    population = Population(
+        size=population_size,
+        schedule_factory=schedule_factory,
+        schedules=manager.spawn(population_size, schedule_factory),
+    )
+    initialization_time: float = timer() - start
+
+    start = timer()
+    for schedule in population.schedules:
+        schedule.calculate_fitness()
+    fitness_time: float = (timer() - start) / population_size
+
+    start = timer()
+    batch_evaluator(problem).evaluate(population.schedules)
+    batch_fitness_time: float = (timer() - start) / population_size
+
+    generation_times: List[float] = []
+    feasible_after: Optional[int] = None
+    time_to_feasible: Optional[float] = None
+    # Run time only: the fitness probes above are not part of the run.
+    run_time: float = initialization_time
+    best_fitness: float = population.get_best_schedule().fitness
+    best_conflicts: List[Progress] = [
+        {
+            "generation": 0,
+            "seconds": run_time,
+            "conflicts": hard_conflicts(best_fitness),
+        }
+    ]
+    if is_feasible(best_fitness):
+        feasible_after, time_to_feasible = 0, run_time
+    for generation in range(1, generations + 1):
+        start = timer()
+        population = manager.evolve(population, schedule_factory)
+        generation_times.append(timer() - start)
+        run_time += generation_times[-1]
+        best_fitness = population.get_best_schedule().fitness
+        best_conflicts.append(
+            {
+                "generation": generation,
+                "seconds": run_time,
+                "conflicts": hard_conflicts(best_fitness),
+            }
+        )
+        if feasible_after is None and is_feasible(best_fitness):
+            feasible_after, time_to_feasible = generation, run_time
+
+    return {
+        "scale": scale,
+        "tightness": tightness,
+        "seed": seed,
+        "sessions": len(problem.sessions),
+        "rooms": len(problem.all_rooms),
+        "professors": len(problem.professors),
+        "population_size": population_size,
+        "generations": generations,
+        "best_fitness": best_fitness,
+        "timings": {
+            "load_data": load_time,
+            "initialization": initialization_time,
+            "calculate_fitness": fitness_time,
+            "batch_fitness": batch_fitness_time,
+            "evolve_per_generation": (
+                mean(generation_times) if generation_times else None
+            ),
+            "time_to_feasible": time_to_feasible,
+        },
+        "generations_to_feasible": feasible_after,
+        "best_conflicts": best_conflicts,
+    }
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Benchmark the engine on synthetic instances.")
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 10],
+        help="instance sizes, 1 ~ input.json",
+    )
+    parser.add_argument(
+        "--tightness",
+        type=float,
+        default=0.25,
+        help="fraction of the day professors are unavailable",
+    )
+    parser.add_argument("--population", type=int, default=50, help="population size")
+    parser.add_argument(
+        "--generations", type=int, default=10, help="generations evolved"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of instances and runs"
+    )
+    parser.add_argument(
+        "--output", default=None, help="JSON file to write (default stdout)"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = parse_args()
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": [
+            run_benchmark(
+                scale, args.tightness, args.population, args.generations, args.seed
+            )
+            for scale in args.scales
+        ],
+    }
+
+    text: str = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
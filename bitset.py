@@ -0,0 +1,44 @@
+from random import Random
+from typing import Iterable, Iterator
+
+# Sets of small non-negative integers (slot, room or period indices) are stored as the
+# bits of a Python int: membership is a shift and a mask, intersection a single `&`.
+
+
+def mask_of(indices: Iterable[int]) -> int:
+    mask: int = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def bits(mask: int) -> Iterator[int]:
+    """Yields the indices of the set bits of `mask`, lowest first."""
+    while mask:
+        lowest: int = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def choose_bit(mask: int, rng: Random) -> int:
+    """Returns the index of a uniformly chosen set bit of a non-zero `mask`."""
+    skip: int = rng.randrange(mask.bit_count())
+    # Halve wide masks by population count first, so wide room masks cost O(log n) ops.
+    offset: int = 0
+    width: int = mask.bit_length()
+    while width > 64:
+        half: int = width >> 1
+        low: int = mask & ((1 << half) - 1)
+        count: int = low.bit_count()
+        if skip < count:
+            mask, width = low, half
+        else:
+            skip -= count
+            mask >>= half
+            offset += half
+            width -= half
+    for index in bits(mask):
+        if not skip:
+            return offset + index
+        skip -= 1
+    raise ValueError("Cannot choose a bit of an empty mask")
@@ -0,0 +1,156 @@
+import os
+from random import Random
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from evaluation import batch_evaluator
+from fitness_cache import FitnessCache, Genome, GenomeHash
+from genetic_alg import SchedulePool
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer
+from stopping import RunController
+
+# Type Aliases
+RandomState = Tuple[int, Tuple[int, ...], Optional[float]]
+CacheEntries = List[Tuple[GenomeHash, Genome]]
+
+
+class Checkpoint(NamedTuple):
+    """Everything needed to continue a run from the start of `generation`."""
+
+    generation: int
+    schedules: SchedulePool
+    random_state: RandomState
+    evaluations: int
+    best_fitness: float
+    improved_at: int
+    elapsed: float
+    cache_entries: CacheEntries
+
+
+def save_checkpoint(
+    path: str,
+    generation: int,
+    schedules: SchedulePool,
+    run_controller: RunController,
+    rng: Random,
+    fitness_cache: Optional[FitnessCache] = None,
+) -> None:
+    """
+    Writes the population, the state of the run's random stream `rng`, the run
+    counters and the entries of `fitness_cache` to `path`.
+
+    The file is a NumPy `.npz` archive of flat buffers: the slot and room genes of the
+    population as (schedules x sessions) int16 matrices, their fitness, the RNG state
+    words, and the cached genome hashes with the genes and fitness of their repaired
+    offspring, laid out the same way. It is written to a temporary file
+    first and then renamed, so an interrupted write never replaces the previous
+    checkpoint.
+    """
+    version, words, gauss_next = rng.getstate()
+    cache_entries: CacheEntries = (
+        fitness_cache.items() if fitness_cache is not None else []
+    )
+    sessions: int = len(schedules[0].slot_genes)
+    temporary: str = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez(
+            file,
+            slot_genes=np.stack(
+                [np.frombuffer(schedule.slot_genes, np.int16) for schedule in schedules]
+            ),
+            room_genes=np.stack(
+                [np.frombuffer(schedule.room_genes, np.int16) for schedule in schedules]
+            ),
+            fitness=np.array(
+                [schedule.fitness for schedule in schedules], dtype=np.float64
+            ),
+            random_words=np.array(words, dtype=np.uint32),
+            random_extra=np.array(
+                [version, np.nan if gauss_next is None else gauss_next],
+                dtype=np.float64,
+            ),
+            counters=np.array(
+                [generation, run_controller.evaluations, run_controller.improved_at],
+                dtype=np.int64,
+            ),
+            progress=np.array(
+                [run_controller.best_fitness, run_controller.elapsed], dtype=np.float64
+            ),
+            cache_keys=np.array([key for key, _ in cache_entries], dtype=np.uint64),
+            cache_slot_genes=np.frombuffer(
+                b"".join(genome[0] for _, genome in cache_entries), np.int16
+            ).reshape(len(cache_entries), sessions),
+            cache_room_genes=np.frombuffer(
+                b"".join(genome[1] for _, genome in cache_entries), np.int16
+            ).reshape(len(cache_entries), sessions),
+            cache_fitness=np.array(
+                [genome[2] for _, genome in cache_entries], dtype=np.float64
+            ),
+        )
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: str, problem: ProblemInstance, rng: Random) -> Checkpoint:
+    """
+    Reads a checkpoint written by `save_checkpoint` for the same problem. The schedules
+    it holds draw from `rng`, to which `random_state` is meant to be restored.
+
+    The fitness of the schedules is recomputed rather than trusted. When it differs
+    from the stored fitness, the file was scored under other constraints or another
+    fitness formula: its cache entries are dropped and the best fitness is taken from
+    the rescored population, so stale and current values never mix.
+
+    Raises:
+        ValueError: If the checkpoint was written for a problem with other sessions.
+    """
+    with np.load(path) as archive:
+        slot_genes: np.ndarray = archive["slot_genes"]
+        room_genes: np.ndarray = archive["room_genes"]
+        if slot_genes.shape[1] != len(problem.sessions):
+            raise ValueError(
+                f"Checkpoint has {slot_genes.shape[1]} sessions per schedule, "
+                f"expected {len(problem.sessions)}"
+            )
+
+        version, gauss_next = archive["random_extra"].tolist()
+        generation, evaluations, improved_at = archive["counters"].tolist()
+        best_fitness, elapsed = archive["progress"].tolist()
+        fitness: np.ndarray = batch_evaluator(problem).evaluate_genes(
+            slot_genes, room_genes
+        )
+        cache_entries: CacheEntries = [
+            (key, (slots.tobytes(), rooms.tobytes(), cached_fitness))
+            for key, slots, rooms, cached_fitness in zip(
+                archive["cache_keys"].tolist(),
+                archive["cache_slot_genes"],
+                archive["cache_room_genes"],
+                archive["cache_fitness"].tolist(),
+            )
+        ]
+        if not np.array_equal(fitness, archive["fitness"]):
+            best_fitness = float(fitness.max())
+            cache_entries = []
+
+        return Checkpoint(
+            generation=generation,
+            schedules=[
+                ScheduleOptimizer.from_genes(
+                    problem, rng, slots.tobytes(), rooms.tobytes(), schedule_fitness
+                )
+                for slots, rooms, schedule_fitness in zip(
+                    slot_genes, room_genes, fitness.tolist()
+                )
+            ],
+            random_state=(
+                int(version),
+                tuple(archive["random_words"].tolist()),
+                None if np.isnan(gauss_next) else gauss_next,
+            ),
+            evaluations=evaluations,
+            best_fitness=best_fitness,
+            improved_at=improved_at,
+            elapsed=elapsed,
+            cache_entries=cache_entries,
+        )
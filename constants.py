@@ -1,17 +1,49 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 POPULATION_SIZE: int = 150
 NUMB_OF_ELITE_SCHEDULES: int = 1
 STAGNANCY_THRESHOLD: int = 20
 TOURNAMENT_SELECTION_SIZE: int = 10
+SELECTION: str = "tournament"
 MUTATION_RATE: float = 0.01
 CROSSOVER_RATE: float = 0.75
 GENERATIONS: int = 2000
+TIME_BUDGET: Optional[float] = None
+TARGET_FITNESS: Optional[float] = None
+TARGET_CONFLICTS: Optional[int] = 0
+MAX_EVALUATIONS: Optional[int] = None
+CHECKPOINT_INTERVAL: int = 10
+WORKERS: int = 1
+WORKER_CHUNK_SIZE: int = 16
+ISLANDS: int = 1
+MIGRATION_INTERVAL: int = 10
+MIGRANTS: int = 2
+MIGRATION_TOPOLOGY: str = "ring"
+MEMETIC_OFFSPRING: int = 0
+LOCAL_SEARCH: str = "tabu"
+LOCAL_SEARCH_ITERATIONS: int = 50
+LOCAL_SEARCH_TIME_BUDGET: float = 0.05
+FITNESS_CACHE_SIZE: int = 4096
+SOFT_CONSTRAINT_WEIGHTS: Dict[str, int] = {
+    "professor_gaps": 1,
+    "consecutive_hours": 1,
+    "course_repeats": 1,
+    "lab_placement": 0,
+}
+MAX_CONSECUTIVE_HOURS: int = 3
+NSGA2_OBJECTIVES: Tuple[str, ...] = (
+    "conflicts",
+    "rooms_used",
+    "professor_gaps",
+    "student_day_length",
+)
+NSGA2_SORT_BLOCK: int = 256
 UNIVERSITY_START_TIME: datetime = datetime.strptime("08:30", "%H:%M")
 UNIVERSITY_END_TIME: datetime = datetime.strptime("16:45", "%H:%M")
 LUNCH_BREAK_START: datetime = datetime.strptime("12:45", "%H:%M")
 LUNCH_BREAK_END: datetime = datetime.strptime("13:30", "%H:%M")
+LAB_PREFERRED_START: datetime = LUNCH_BREAK_END
 TIME_SLOT_DURATION: timedelta = timedelta(hours=1)
 LAB_TIME_SLOT_DURATION: timedelta = timedelta(hours=2)
 DAYS_OF_WEEK: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
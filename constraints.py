@@ -0,0 +1,316 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Type
+
+import numpy as np
+
+from bitset import bits
+from constants import (
+    LAB_PREFERRED_START,
+    MAX_CONSECUTIVE_HOURS,
+    SOFT_CONSTRAINT_WEIGHTS,
+)
+from models import TimeSlot
+from timeslots import (
+    max_slot_periods,
+    num_days,
+    periods_per_day,
+    slot_days,
+    slot_period_masks,
+    slot_periods,
+    time_slots,
+)
+
+if TYPE_CHECKING:
+    from problem import ProblemInstance, Session
+
+# Type Aliases
+PenaltyTable = Tuple[int, ...]
+Penalties = Dict[str, int]
+
+# Bitset of every period of one day.
+DAY_MASK: int = (1 << periods_per_day) - 1
+
+
+class SoftConstraint(ABC):
+    """
+    A weighted soft penalty term of the fitness.
+
+    Terms are compiled once per problem into lookup tables. `evaluate` scores whole
+    populations from those tables in one NumPy pass, and `SoftConstraints` merges the
+    tables of all terms of a kind so a schedule's `Occupancy` can keep the weighted
+    total current under single-session moves. New terms subclass one of the three
+    kinds below and implement its scalar penalty.
+
+    Attributes:
+        name (str): Key of the term in `SOFT_CONSTRAINTS` and in penalty breakdowns.
+        weight (int): Penalty points per unit of the term.
+    """
+
+    name: str = ""
+
+    def __init__(self, weight: int = 1) -> None:
+        if not weight >= 0:
+            raise ValueError("Expected a non-negative weight")
+
+        self.weight: int = weight
+
+    @abstractmethod
+    def compile(self, problem: "ProblemInstance") -> None:
+        """Builds the lookup tables of this term for `problem`."""
+
+    @abstractmethod
+    def evaluate(self, slots: np.ndarray) -> np.ndarray:
+        """Unweighted penalty of every row of a (schedules x sessions) slot gene matrix."""
+
+
+class ProfessorDayConstraint(SoftConstraint):
+    """A penalty on the periods a professor teaches within each day."""
+
+    @abstractmethod
+    def day_penalty(self, busy: int) -> int:
+        """Penalty of a day whose taught periods are the bitset `busy`."""
+
+    def compile(self, problem: "ProblemInstance") -> None:
+        self.table: PenaltyTable = tuple(
+            self.day_penalty(busy) for busy in range(DAY_MASK + 1)
+        )
+        self._table: np.ndarray = np.asarray(self.table, dtype=np.int64)
+        self._num_professors: int = len(problem.professors)
+        self._session_professor: np.ndarray = np.asarray(
+            problem.session_professor, dtype=np.int64
+        )
+        self._slot_periods: np.ndarray = np.full(
+            (len(time_slots), max_slot_periods), -1, dtype=np.int64
+        )
+        for slot, periods in enumerate(slot_periods):
+            self._slot_periods[slot, : len(periods)] = periods
+
+    def evaluate(self, slots: np.ndarray) -> np.ndarray:
+        placed: np.ndarray = slots >= 0
+        periods: np.ndarray = self._slot_periods[np.where(placed, slots, 0)]
+        rows, sessions, positions = np.nonzero(placed[:, :, None] & (periods >= 0))
+        booked: np.ndarray = periods[rows, sessions, positions]
+
+        # Bitset of the periods taught by every (schedule, professor, day).
+        days: np.ndarray = np.zeros(
+            (len(slots), self._num_professors, num_days), dtype=np.int64
+        )
+        np.bitwise_or.at(
+            days,
+            (rows, self._session_professor[sessions], booked // periods_per_day),
+            1 << booked % periods_per_day,
+        )
+        return self._table[days].sum(axis=(1, 2))
+
+
+class GroupDayConstraint(SoftConstraint):
+    """A penalty on the number of sessions of a count group held on the same day."""
+
+    @abstractmethod
+    def count_penalty(self, count: int) -> int:
+        """Penalty of a day holding `count` sessions of one group."""
+
+    def compile(self, problem: "ProblemInstance") -> None:
+        self.table: PenaltyTable = tuple(
+            self.count_penalty(count) for count in range(max(problem.group_sizes) + 1)
+        )
+        self._table: np.ndarray = np.asarray(self.table, dtype=np.int64)
+        self._num_groups: int = len(problem.group_sizes)
+        self._session_group: np.ndarray = np.asarray(
+            problem.session_group, dtype=np.int64
+        )
+        self._slot_days: np.ndarray = np.asarray(slot_days, dtype=np.int64)
+
+    def evaluate(self, slots: np.ndarray) -> np.ndarray:
+        placed: np.ndarray = slots >= 0
+        rows: np.ndarray = np.arange(len(slots), dtype=np.int64)[:, None]
+        keys: np.ndarray = (
+            rows * self._num_groups + self._session_group
+        ) * num_days + self._slot_days[np.where(placed, slots, 0)]
+        counts: np.ndarray = np.bincount(
+            keys.ravel(),
+            weights=placed.ravel(),
+            minlength=len(slots) * self._num_groups * num_days,
+        ).astype(np.int64)
+        return self._table[counts].reshape(len(slots), -1).sum(axis=1)
+
+
+class SessionSlotConstraint(SoftConstraint):
+    """A penalty on the slot each session is placed in."""
+
+    @abstractmethod
+    def slot_penalty(self, session: "Session", slot: TimeSlot) -> int:
+        """Penalty of `session` placed in `slot`."""
+
+    def compile(self, problem: "ProblemInstance") -> None:
+        self.table: Tuple[PenaltyTable, ...] = tuple(
+            tuple(self.slot_penalty(session, slot) for slot in time_slots)
+            for session in problem.sessions
+        )
+        self._table: np.ndarray = np.asarray(self.table, dtype=np.int64).reshape(
+            len(problem.sessions), len(time_slots)
+        )
+
+    def evaluate(self, slots: np.ndarray) -> np.ndarray:
+        placed: np.ndarray = slots >= 0
+        sessions: np.ndarray = np.arange(slots.shape[1])
+        return (self._table[sessions, np.where(placed, slots, 0)] * placed).sum(axis=1)
+
+
+class ProfessorGaps(ProfessorDayConstraint):
+    """Idle teachable periods between a professor's first and last period of a day."""
+
+    name = "professor_gaps"
+
+    def compile(self, problem: "ProblemInstance") -> None:
+        # Periods no session can ever be taught in (breaks) are not idle time.
+        feasible: int = 0
+        for session_slots in problem.session_slots:
+            feasible |= session_slots
+        teachable: int = 0
+        for slot in bits(feasible):
+            teachable |= slot_period_masks[slot] >> slot_days[slot] * periods_per_day
+        self.teachable: int = teachable
+        super().compile(problem)
+
+    def day_penalty(self, busy: int) -> int:
+        if not busy:
+            return 0
+        first: int = busy & -busy
+        span: int = (1 << busy.bit_length()) - first
+        return (span & ~busy & self.teachable).bit_count()
+
+
+class ConsecutiveHours(ProfessorDayConstraint):
+    """Periods a professor teaches beyond `limit` in a row."""
+
+    name = "consecutive_hours"
+
+    def __init__(self, weight: int = 1, limit: int = MAX_CONSECUTIVE_HOURS) -> None:
+        super().__init__(weight)
+        if not limit > 0:
+            raise ValueError("Expected a positive limit")
+
+        self.limit: int = limit
+
+    def day_penalty(self, busy: int) -> int:
+        penalty: int = 0
+        run: int = 0
+        for period in range(periods_per_day):
+            run = run + 1 if busy >> period & 1 else 0
+            penalty += run > self.limit
+        return penalty
+
+
+class CourseRepeats(GroupDayConstraint):
+    """Sessions of a course beyond the first on one day, per division (labs: per batch)."""
+
+    name = "course_repeats"
+
+    def count_penalty(self, count: int) -> int:
+        return max(0, count - 1)
+
+
+class LabPlacement(SessionSlotConstraint):
+    """Labs starting before `start`, the preferred earliest start of a lab."""
+
+    name = "lab_placement"
+
+    def __init__(self, weight: int = 1, start: datetime = LAB_PREFERRED_START) -> None:
+        super().__init__(weight)
+        self.start: datetime = start
+
+    def slot_penalty(self, session: "Session", slot: TimeSlot) -> int:
+        return int(session.is_lab and slot.start < self.start)
+
+
+# Every built-in term, by name.
+SOFT_CONSTRAINTS: Dict[str, Type[SoftConstraint]] = {
+    term.name: term
+    for term in (ProfessorGaps, ConsecutiveHours, CourseRepeats, LabPlacement)
+}
+
+
+def create_soft_constraints(
+    weights: Optional[Dict[str, int]] = None,
+) -> List[SoftConstraint]:
+    """
+    Creates the built-in terms of `SOFT_CONSTRAINTS` named in `weights` with their
+    weights (`SOFT_CONSTRAINT_WEIGHTS` by default), leaving out zero weights.
+
+    Raises:
+        ValueError: If a name is not known.
+    """
+    weights = SOFT_CONSTRAINT_WEIGHTS if weights is None else weights
+    terms: List[SoftConstraint] = []
+    for name, weight in weights.items():
+        if name not in SOFT_CONSTRAINTS:
+            raise ValueError(f"Unknown soft constraint '{name}'")
+        if weight:
+            terms.append(SOFT_CONSTRAINTS[name](weight))
+    return terms
+
+
+class SoftConstraints:
+    """
+    The soft constraints of a problem, compiled.
+
+    The weighted tables of all terms of a kind are summed into one, so the running
+    penalty of a schedule costs the same few lookups per move however many terms
+    there are.
+
+    Attributes:
+        terms (Tuple[SoftConstraint, ...]): The compiled terms.
+        professor_day_table (Tuple[int, ...]): Weighted penalty of a professor's day, by
+            the bitset of periods they teach that day.
+        group_day_table (Tuple[int, ...]): Weighted penalty of a day, by the number of
+            sessions of one count group it holds.
+        session_slot_table (Tuple[Tuple[int, ...], ...]): Weighted penalty of each
+            session in each slot.
+    """
+
+    def __init__(
+        self, problem: "ProblemInstance", terms: Iterable[SoftConstraint]
+    ) -> None:
+        self.terms: Tuple[SoftConstraint, ...] = tuple(terms)
+        for term in self.terms:
+            term.compile(problem)
+
+        self.professor_day_table: PenaltyTable = self._merge(
+            ProfessorDayConstraint, DAY_MASK + 1
+        )
+        self.group_day_table: PenaltyTable = self._merge(
+            GroupDayConstraint, max(problem.group_sizes, default=0) + 1
+        )
+        session_slot: np.ndarray = np.zeros(
+            (len(problem.sessions), len(time_slots)), dtype=np.int64
+        )
+        for term in self.terms:
+            if isinstance(term, SessionSlotConstraint):
+                session_slot += term.weight * np.asarray(term.table, dtype=np.int64)
+        self.session_slot_table: Tuple[PenaltyTable, ...] = tuple(
+            map(tuple, session_slot.tolist())
+        )
+
+    def evaluate(self, slots: np.ndarray) -> np.ndarray:
+        """Weighted penalty of every row of a (schedules x sessions) slot gene matrix."""
+        penalty: np.ndarray = np.zeros(len(slots), dtype=np.int64)
+        for term in self.terms:
+            penalty += term.weight * term.evaluate(slots)
+        return penalty
+
+    def breakdown(self, slots: np.ndarray) -> Penalties:
+        """Weighted penalty of every term for the slot genes of a single schedule."""
+        return {
+            term.name: term.weight * int(term.evaluate(slots[None, :])[0])
+            for term in self.terms
+        }
+
+    def _merge(self, kind: Type[SoftConstraint], size: int) -> PenaltyTable:
+        merged: List[int] = [0] * size
+        for term in self.terms:
+            if isinstance(term, kind):
+                for key, penalty in enumerate(term.table):
+                    merged[key] += term.weight * penalty
+        return tuple(merged)
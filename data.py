@@ -1,9 +1,11 @@
 from datetime import datetime
 from json import load
-from typing import Any, Callable, Dict, Iterable, List, Set
+from random import Random
+from typing import Any, Dict, Iterable, List, Optional
 
 from prettytable import PrettyTable
 
+from constraints import SoftConstraint
 from models import (
     Course,
     Department,
@@ -12,19 +14,18 @@ from models import (
     Room,
     ScheduledClass,
     TimeSlot,
+    generate_id,
 )
+from problem import ProblemInstance
 from schedule import ScheduleOptimizer
 
 TimeSlots = List[TimeSlot]
 ScheduledClasses = List[ScheduledClass]
 Rooms = List[Room]
 Departments = List[Department]
-Divisions = Set[Division]
+Divisions = List[Division]
 Professors = List[Professor]
 
-# Callable Types
-RegisterFunc = Callable[[Any], None]
-
 # Define the custom weekday order
 weekday_order: Dict[str, int] = {
     "Monday": 0,
@@ -71,7 +72,17 @@ def sort_and_display(schedule: ScheduleOptimizer) -> PrettyTable:
     return table
 
 
-def load_data() -> ScheduleOptimizer:
+def load_data(
+    path: str = "input.json",
+    rng: Optional[Random] = None,
+    soft_constraints: Optional[Iterable[SoftConstraint]] = None,
+) -> ProblemInstance:
+    """
+    Loads a problem from `path`; professor and course IDs are drawn from `rng`, and
+    `soft_constraints`, when given, replace the default soft penalty terms.
+    """
+    id_rng: Random = rng if rng is not None else Random()
+
     def create_rooms(room_sequence: List[Dict[str, Any]]) -> Rooms:
         return [Room(room["room_number"]) for room in room_sequence]
 
@@ -81,6 +92,7 @@ def load_data() -> ScheduleOptimizer:
                 name=prof["name"],
                 available_start=datetime.strptime(prof["available"]["start"], "%H:%M"),
                 available_end=datetime.strptime(prof["available"]["end"], "%H:%M"),
+                professor_id=generate_id(n=4, rng=id_rng),
             )
             for prof in professor_sequence
         ]
@@ -93,6 +105,7 @@ def load_data() -> ScheduleOptimizer:
                 courses=[
                     Course(
                         title=course["title"],
+                        code=generate_id(n=8, rng=id_rng),
                         weekly_lectures=course["weekly_lectures"],
                         weekly_labs=course["weekly_labs"],
                     )
@@ -117,7 +130,7 @@ def load_data() -> ScheduleOptimizer:
                     course.assign_lab_professor(professors[lab_prof_index])
                     lab_prof_index = (lab_prof_index + 1) % prof_count
 
-    with open("input.json", "r") as f:
+    with open(path, "r") as f:
         data = load(f)
 
     rooms = create_rooms(data["rooms"])
@@ -126,21 +139,16 @@ def load_data() -> ScheduleOptimizer:
     departments = create_departments(data["departments"])
     assign_professors(depts=departments, professors=professors)
 
-    divisions: Divisions = {
+    divisions: Divisions = [
         Division(name=div["name"], num_batches=div["num_batches"])
         for div in data["divisions"]
-    }
-
-    def register_entity(entity_list: Iterable[Any], register_func: RegisterFunc) -> None:
-        for entity in entity_list:
-            try:
-                register_func(entity)
-            except ValueError:
-                continue
-
-    default_schedule = ScheduleOptimizer()
-    register_entity(rooms, default_schedule.register_room)
-    register_entity(lab_rooms, default_schedule.register_lab_room)
-    register_entity(departments, default_schedule.register_department)
-    register_entity(divisions, default_schedule.register_division)
-    return default_schedule
+    ]
+
+    return ProblemInstance(
+        rooms=rooms,
+        lab_rooms=lab_rooms,
+        departments=departments,
+        divisions=divisions,
+        professors=professors,
+        soft_constraints=soft_constraints,
+    )
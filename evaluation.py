@@ -0,0 +1,132 @@
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+
+from constraints import SoftConstraints
+from problem import ProblemInstance
+from schedule import UNPLACED, Genes, ScheduleOptimizer
+from timeslots import max_slot_periods, num_periods, slot_periods, time_slots
+
+
+class BatchEvaluator:
+    """
+    Scores a whole population in one NumPy pass.
+
+    Genes of P schedules are stacked into (P x sessions) matrices and every
+    conflict counter of `ScheduleOptimizer.calculate_fitness` is computed
+    column-wise, as is every soft constraint term of the problem. Slot genes are
+    expanded through a (slots x periods) table into the atomic periods they
+    cover; clashing bookings are then counted by sorting the per-row (resource,
+    period) keys and counting equal neighbours, and session counts with a single
+    bincount. Student groups book through flat (session, student group) pairs,
+    one per batch attending a lecture. The result is identical to scoring each
+    schedule on its own.
+
+    It is meant for schedules without occupancy tables: genes bred in worker
+    processes or read from a checkpoint. Serial offspring already carry the
+    fitness their repair and mutation kept current, so the serial loop does not
+    use it.
+    """
+
+    def __init__(self, problem: ProblemInstance) -> None:
+        self.num_sessions: int = len(problem.sessions)
+        self.num_periods: int = num_periods
+        # Periods covered by each slot, padded with -1 for slots covering fewer.
+        self.slot_period_table: np.ndarray = np.full(
+            (len(time_slots), max_slot_periods), -1, dtype=np.int64
+        )
+        for slot, periods in enumerate(slot_periods):
+            self.slot_period_table[slot, : len(periods)] = periods
+        self.session_professor: np.ndarray = np.asarray(
+            problem.session_professor, dtype=np.int64
+        )
+        self.session_group: np.ndarray = np.asarray(
+            problem.session_group, dtype=np.int64
+        )
+        self.group_sizes: np.ndarray = np.asarray(problem.group_sizes, dtype=np.int64)
+        self.pair_session: np.ndarray = np.asarray(
+            [
+                index
+                for index, groups in enumerate(problem.session_student_groups)
+                for _ in groups
+            ],
+            dtype=np.int64,
+        )
+        self.pair_student_group: np.ndarray = np.asarray(
+            [group for groups in problem.session_student_groups for group in groups],
+            dtype=np.int64,
+        )
+        self.soft_constraints: SoftConstraints = problem.soft_constraints
+        # Unused booking positions get a distinct negative key so they never collide.
+        self._unused_keys: np.ndarray = -1 - np.arange(
+            max(self.num_sessions, len(self.pair_session)) * max_slot_periods,
+            dtype=np.int64,
+        )
+
+    def evaluate(self, schedules: Sequence[ScheduleOptimizer]) -> List[float]:
+        slots: np.ndarray = self.stack([schedule.slot_genes for schedule in schedules])
+        rooms: np.ndarray = self.stack([schedule.room_genes for schedule in schedules])
+        return self.evaluate_genes(slots, rooms).tolist()
+
+    def stack(self, genes: Sequence[Genes]) -> np.ndarray:
+        buffer: bytes = b"".join(gene.tobytes() for gene in genes)
+        return np.frombuffer(buffer, dtype=np.int16).reshape(
+            len(genes), self.num_sessions
+        )
+
+    def evaluate_genes(self, slots: np.ndarray, rooms: np.ndarray) -> np.ndarray:
+        slots = slots.astype(np.int64)
+        conflicts: np.ndarray = self.conflicts(slots, rooms)
+
+        # Same formula as `fitness_from_scores`, on arrays.
+        penalty: np.ndarray = self.soft_constraints.evaluate(slots)
+        return 1.0 / (1.0 + conflicts + penalty / (1.0 + penalty))
+
+    def conflicts(self, slots: np.ndarray, rooms: np.ndarray) -> np.ndarray:
+        """Hard conflict count of every row of (P x sessions) slot and room gene matrices."""
+        slots = slots.astype(np.int64)
+        rooms = rooms.astype(np.int64)
+        placed: np.ndarray = slots != UNPLACED
+
+        # (P x sessions x periods) periods booked by every gene, -1 where unused.
+        periods: np.ndarray = self.slot_period_table[np.where(placed, slots, 0)]
+        booked: np.ndarray = placed[:, :, None] & (periods >= 0)
+        room_keys: np.ndarray = rooms[:, :, None] * self.num_periods + periods
+        professor_keys: np.ndarray = (
+            self.session_professor[None, :, None] * self.num_periods + periods
+        )
+
+        student_keys: np.ndarray = (
+            self.pair_student_group[None, :, None] * self.num_periods
+            + periods[:, self.pair_session]
+        )
+
+        return (
+            self._count_clashes(room_keys, booked)
+            + self._count_clashes(professor_keys, booked)
+            + self._count_clashes(student_keys, booked[:, self.pair_session])
+            + self._count_session_shortfall(placed)
+        )
+
+    def _count_clashes(self, keys: np.ndarray, booked: np.ndarray) -> np.ndarray:
+        """Clashing bookings per row of (P x bookings x periods) keys and booked flags."""
+        keys = keys.reshape(len(keys), -1)
+        unused: np.ndarray = self._unused_keys[: keys.shape[1]]
+        keys = np.sort(np.where(booked.reshape(len(keys), -1), keys, unused), axis=1)
+        return (keys[:, 1:] == keys[:, :-1]).sum(axis=1)
+
+    def _count_session_shortfall(self, placed: np.ndarray) -> np.ndarray:
+        num_groups: int = len(self.group_sizes)
+        rows: np.ndarray = np.arange(placed.shape[0], dtype=np.int64)[:, None]
+        counts: np.ndarray = np.bincount(
+            (rows * num_groups + self.session_group).ravel(),
+            weights=placed.ravel(),
+            minlength=placed.shape[0] * num_groups,
+        ).reshape(placed.shape[0], num_groups)
+        return np.abs(self.group_sizes - counts).sum(axis=1).astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def batch_evaluator(problem: ProblemInstance) -> BatchEvaluator:
+    return BatchEvaluator(problem)
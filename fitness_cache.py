@@ -0,0 +1,93 @@
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from constants import FITNESS_CACHE_SIZE
+
+# Type Aliases
+GenomeHash = int
+Genome = Tuple[bytes, bytes, float]
+
+MASK_64: int = (1 << 64) - 1
+
+
+def gene_key(index: int, slot: int, room: int) -> int:
+    """
+    Random-looking 64-bit key of session `index` placed at (slot, room), `UNPLACED`
+    included. A genome hashes to the XOR of the keys of its genes, so changing one gene
+    updates the hash with two XORs.
+    """
+    # SplitMix64 finalizer of the packed gene; `UNPLACED` (-1) packs as 0.
+    key: int = (index << 32 | (slot + 1) << 16 | (room + 1)) + 0x9E3779B97F4A7C15
+    key = ((key ^ key >> 30) * 0xBF58476D1CE4E5B9) & MASK_64
+    key = ((key ^ key >> 27) * 0x94D049BB133111EB) & MASK_64
+    return key ^ key >> 31
+
+
+def genome_hash(slot_genes: array, room_genes: array) -> GenomeHash:
+    """XOR of the `gene_key` of every gene, computed in one vectorized pass."""
+    slots: np.ndarray = np.frombuffer(slot_genes, np.int16).astype(np.uint64)
+    rooms: np.ndarray = np.frombuffer(room_genes, np.int16).astype(np.uint64)
+    keys: np.ndarray = (
+        np.arange(len(slots), dtype=np.uint64) << np.uint64(32)
+        | (slots + np.uint64(1) & np.uint64(0xFFFF)) << np.uint64(16)
+        | (rooms + np.uint64(1) & np.uint64(0xFFFF))
+    ) + np.uint64(0x9E3779B97F4A7C15)
+    keys = (keys ^ keys >> np.uint64(30)) * np.uint64(0xBF58476D1CE4E5B9)
+    keys = (keys ^ keys >> np.uint64(27)) * np.uint64(0x94D049BB133111EB)
+    keys ^= keys >> np.uint64(31)
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+
+
+class FitnessCache:
+    """
+    Repaired offspring of recently seen genomes: the slot genes, room genes and fitness
+    of the schedule that `ScheduleOptimizer.repair` makes of a genome, keyed by the
+    `genome_hash` of that genome before repair.
+
+    Crossover of converged parents keeps producing the same genome, and repair, which
+    draws from a stream seeded by that hash, always makes the same schedule of it, so
+    a hit replaces a repair without changing the run.
+
+    Holds at most `capacity` entries and forgets the least recently used first. Two
+    genomes sharing a 64-bit hash would share a repair; at population sizes that is
+    vanishingly unlikely, and only ever affects a single offspring.
+
+    Attributes:
+        capacity (int): Maximum number of genomes remembered.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups of genomes not in the cache.
+    """
+
+    def __init__(self, capacity: int = FITNESS_CACHE_SIZE) -> None:
+        if not capacity > 0:
+            raise ValueError("Expected a positive cache capacity")
+
+        self.capacity: int = capacity
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[GenomeHash, Genome]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[GenomeHash, Genome]]:
+        """Entries from least to most recently used; `put` them in order to rebuild."""
+        return list(self._entries.items())
+
+    def get(self, key: GenomeHash) -> Optional[Genome]:
+        genome: Optional[Genome] = self._entries.get(key)
+        if genome is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return genome
+
+    def put(self, key: GenomeHash, genome: Genome) -> None:
+        self._entries[key] = genome
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
@@ -1,18 +1,27 @@
-from datetime import datetime, timedelta
-from random import choice, randint, random, sample
+from random import Random
 from typing import Callable, List, Optional, Tuple
 
-from constants import UNIVERSITY_END_TIME, UNIVERSITY_START_TIME
-from models import ScheduledClass
-from schedule import ScheduleOptimizer
+from evaluation import batch_evaluator
+from fitness_cache import FitnessCache, Genome, GenomeHash
+from local_search import LocalSearch
+from metrics import Metrics, PhaseClock, PhaseTimes
+from schedule import Placement, ScheduleOptimizer
+from selection import Selection, TournamentSelection
 
 # Type Aliases
 SchedulePool = List[ScheduleOptimizer]
 SchedFactory = Callable[[], ScheduleOptimizer]
 NullableSchedulePool = Optional[SchedulePool]
+Parents = Tuple[ScheduleOptimizer, ScheduleOptimizer]
 
 
 class Population:
+    """
+    The schedules of one generation. `size` is the capacity of the population: every
+    generation evolved from it has exactly `size` schedules, and newcomers replace the
+    least fit residents instead of growing it.
+    """
+
     def __init__(
         self,
         size: int,
@@ -31,35 +40,37 @@ class Population:
         ]
 
     def evaulaute_fitness(self) -> None:
-        for schedule in self.schedules:
-            schedule.fitness = schedule.calculate_fitness()
+        # Schedules kept current by incremental moves carry a valid fitness already.
+        stale: SchedulePool = [
+            schedule for schedule in self.schedules if schedule.fitness < 0.0
+        ]
+        if stale:
+            evaluator = batch_evaluator(stale[0].problem)
+            for schedule, fitness in zip(stale, evaluator.evaluate(stale)):
+                schedule.fitness = fitness
 
     def get_best_schedule(self) -> ScheduleOptimizer:
         return max(self.schedules, key=lambda s: s.fitness)
 
-    def select_parents(self) -> Tuple[ScheduleOptimizer, ScheduleOptimizer]:
-        parent1: ScheduleOptimizer = self._tournament_selection(self.schedules)
-        parent2: ScheduleOptimizer = self._tournament_selection(self.schedules)
-        return parent1, parent2
-
-    def _roulette_selection(self, total_fitness: float) -> ScheduleOptimizer:
-        pick: float = random() * total_fitness
-        current: float = 0
-        for schedule in self.schedules:
-            current += (
-                schedule.fitness
-                if schedule.fitness != 0 or schedule.fitness != -1
-                else schedule.calculate_fitness()
-            )
-            if current > pick:
-                return schedule
-
-        # In case of rounding errors, return the last one
-        return self.schedules[-1]
-
-    def _tournament_selection(self, population: SchedulePool) -> ScheduleOptimizer:
-        tournament: SchedulePool = sample(population, len(population) * 5 // 100)
-        return max(tournament, key=lambda s: s.fitness)
+    def replace_worst(self, newcomers: SchedulePool) -> None:
+        """Replaces the least fit schedules with `newcomers`, always keeping the best one."""
+        newcomers = newcomers[: len(self.schedules) - 1]
+        if not newcomers:
+            return
+        self.schedules.sort(key=lambda s: s.fitness, reverse=True)
+        self.schedules[-len(newcomers) :] = newcomers
+
+    def select_parents(
+        self, count: int, selection: Selection, rng: Random
+    ) -> List[Parents]:
+        """Draws `count` pairs of parents with a single call to `selection`."""
+        picks: List[int] = selection.select(
+            [schedule.fitness for schedule in self.schedules], 2 * count, rng
+        )
+        return [
+            (self.schedules[first], self.schedules[second])
+            for first, second in zip(picks[::2], picks[1::2])
+        ]
 
 
 class EvolutionManager:
@@ -69,15 +80,39 @@ class EvolutionManager:
     Attributes:
         _mutation_rate (float): The probability of mutation occurring during evolution.
         _crossover_rate (float): The probability of crossover occurring during evolution.
+        _local_search (Optional[LocalSearch]): Local search applied to the best offspring of
+            every generation (memetic mode), or None.
+        rng (Random): Random stream of the run, used for selection, crossover and mutation.
+        fitness_cache (Optional[FitnessCache]): Repaired offspring of recently seen
+            genomes, or None.
+        _selection (Selection): How parents are chosen from the population.
+        phase_times (Dict[str, float]): Seconds spent per phase (selection, crossover, ...)
+            by the last `evolve`; only measured when the manager has enabled metrics.
     """
 
-    def __init__(self, mutation_rate: float, crossover_rate: float) -> None:
+    def __init__(
+        self,
+        mutation_rate: float,
+        crossover_rate: float,
+        local_search: Optional[LocalSearch] = None,
+        rng: Optional[Random] = None,
+        metrics: Optional[Metrics] = None,
+        fitness_cache: Optional[FitnessCache] = None,
+        selection: Optional[Selection] = None,
+    ) -> None:
         """
         Initializes the EvolutionManager with mutation and crossover rates.
 
         Args:
             mutation_rate (float): The probability of mutation (must be > 0.0).
             crossover_rate (float): The probability of crossover (must be > 0.0).
+            local_search (Optional[LocalSearch]): Enables the memetic mode when given.
+            rng (Optional[Random]): Random stream of the run; an unseeded one when omitted.
+            metrics (Optional[Metrics]): Turns on phase timing when given and enabled.
+            fitness_cache (Optional[FitnessCache]): Lets crossover offspring that repeat
+                a known genome skip repair when given.
+            selection (Optional[Selection]): Parent selection; a `TournamentSelection` of
+                `TOURNAMENT_SELECTION_SIZE` schedules when omitted.
 
         Raises:
             ValueError: If either mutation_rate or crossover_rate is not a positive float.
@@ -90,25 +125,63 @@ class EvolutionManager:
 
         self._mutation_rate: float = mutation_rate
         self._crossover_rate: float = crossover_rate
+        self._local_search: Optional[LocalSearch] = local_search
+        self.rng: Random = rng if rng is not None else Random()
+        self.phase_times: PhaseTimes = {}
+        self._timed: bool = metrics is not None and metrics.enabled
+        self.fitness_cache: Optional[FitnessCache] = fitness_cache
+        self._selection: Selection = (
+            selection if selection is not None else TournamentSelection()
+        )
+
+    def __enter__(self) -> "EvolutionManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases any resources held by the manager. Nothing to do when running serially."""
+
+    def spawn(self, count: int, schedule_factory: SchedFactory) -> SchedulePool:
+        """
+        Creates `count` freshly initialized schedules.
+
+        Args:
+            count (int): Number of schedules to create.
+            schedule_factory (Callable[[], ScheduleOptimizer]): A factory function for creating a new ScheduleOptimizer instance.
+
+        Returns:
+            List[ScheduleOptimizer]: The new schedules, with their fitness already known.
+        """
+        return [schedule_factory().create_schedule() for _ in range(count)]
 
     def mutate(self, schedule_optimizer: ScheduleOptimizer) -> None:
         """
-        Applies cascade mutation to a given schedule by modifying a random class's time slot.
+        Applies conflict-directed mutation to a given schedule.
+
+        A session is drawn from the clashing and unplaced sessions of the schedule (or
+        from all placed sessions when there are none) and moved to a random slot of its
+        precomputed feasible set, in a room of its pool that is free then if any.
 
         Args:
             schedule_optimizer (ScheduleOptimizer): The schedule to be mutated.
 
         Side Effects:
-            Modifies the `time_slot` of a random class in the schedule if mutation occurs.
+            Moves one session, updating the schedule's fitness incrementally.
         """
-        if random() < self._mutation_rate:
-            random_class: ScheduledClass = choice(schedule_optimizer.raw_schedule)
-            new_start_time: datetime = random_class.time_slot.start + timedelta(
-                hours=randint(-1, 1)
-            )
-
-            if UNIVERSITY_START_TIME <= new_start_time <= UNIVERSITY_END_TIME:
-                random_class.time_slot.start = new_start_time
+        if self.rng.random() < self._mutation_rate:
+            candidates: List[int] = (
+                schedule_optimizer.conflicting_sessions()
+                + schedule_optimizer.unplaced_sessions()
+            ) or schedule_optimizer.placed_sessions()
+            if not candidates:
+                return
+
+            index: int = self.rng.choice(candidates)
+            placement: Optional[Placement] = schedule_optimizer.random_placement(index)
+            if placement is not None:
+                schedule_optimizer.move_session(index, *placement)
 
     def crossover(
         self,
@@ -119,6 +192,12 @@ class EvolutionManager:
         """
         Creates an offspring schedule by combining the schedules of two parent schedules.
 
+        Genes are indexed by session identity (course, division, batch, occurrence), so
+        parents are always aligned. The offspring takes the sessions of each course and
+        division as a block from either parent, one slice copy per block, and a greedy
+        repair pass then moves clashing or unplaced sessions to free rooms and slots.
+        Offspring repeating a genome held by `fitness_cache` take its repair instead.
+
         Args:
             parent_a (ScheduleOptimizer): The first parent schedule.
             parent_b (ScheduleOptimizer): The second parent schedule.
@@ -127,21 +206,37 @@ class EvolutionManager:
         Returns:
             ScheduleOptimizer: The offspring schedule created from the two parents.
         """
-        if random() > self._crossover_rate:
-            # No crossover, return one parent
-            return choice([parent_a, parent_b])
+        if self.rng.random() > self._crossover_rate:
+            # No crossover, pass one parent through; the clone shares its genes until mutated
+            return self.rng.choice([parent_a, parent_b]).clone()
 
         offspring: ScheduleOptimizer = schedule_factory()
+        offspring.inherit(parent_a)
+        for start, stop in parent_a.problem.session_blocks:
+            if self.rng.random() < 0.5:
+                offspring.inherit(parent_b, start, stop)
+
+        # Repair draws from a stream seeded by the genome, so a repeated genome is
+        # always repaired the same way and the cache cannot change the run.
+        key: GenomeHash = offspring.genome_hash
+        cached: Optional[Genome] = (
+            self.fitness_cache.get(key) if self.fitness_cache is not None else None
+        )
+        if cached is not None:
+            return ScheduleOptimizer.from_genes(
+                offspring.problem, offspring.rng, *cached
+            )
 
-        offspring.raw_schedule = [
-            choice([class_a, class_b])
-            for class_a, class_b in zip(parent_a.raw_schedule, parent_b.raw_schedule)
-        ]
-
-        offspring.rooms = parent_a.rooms
-        offspring.lab_rooms = parent_b.lab_rooms
-        offspring.departments = parent_a.departments
-        offspring.divisions = parent_b.divisions
+        offspring.repair(Random(key))
+        if self.fitness_cache is not None:
+            self.fitness_cache.put(
+                key,
+                (
+                    offspring.slot_genes.tobytes(),
+                    offspring.room_genes.tobytes(),
+                    offspring.fitness,
+                ),
+            )
         return offspring
 
     def evolve(
@@ -151,7 +246,8 @@ class EvolutionManager:
         Evolves a population to create the next generation of schedules.
 
         The evolution process involves selecting the best schedule, performing crossover
-        and mutation, and forming a new population.
+        and mutation, and forming a new population. In memetic mode the best offspring
+        are then improved by local search.
 
         Args:
             population (Population): The current population of schedules.
@@ -160,19 +256,39 @@ class EvolutionManager:
         Returns:
             Population: The next generation of schedules.
         """
+        clock = PhaseClock(self._timed)
+        lap: float = clock.now()
         next_generation: SchedulePool = [population.get_best_schedule()]
+        parents: List[Parents] = population.select_parents(
+            population.size - 1, self._selection, self.rng
+        )
+        lap = clock.lap("selection", lap)
 
-        while len(next_generation) < len(population.schedules):
-            parent_a, parent_b = population.select_parents()
+        for parent_a, parent_b in parents:
             offspring = self.crossover(parent_a, parent_b, schedule_factory)
+            lap = clock.lap("crossover", lap)
             self.mutate(offspring)
+            lap = clock.lap("mutation", lap)
             next_generation.append(offspring)
+        lap = self._improve_offspring(next_generation, clock, lap)
 
         new_population: Population = Population(
-            size=len(next_generation),
+            size=population.size,
             schedule_factory=schedule_factory,
             schedules=next_generation,
         )
-        new_population.schedules = next_generation
         new_population.evaulaute_fitness()
+        clock.lap("evaluation", lap)
+        self.phase_times = clock.phases
         return new_population
+
+    def _improve_offspring(
+        self, next_generation: SchedulePool, clock: PhaseClock, lap: float
+    ) -> float:
+        # The elite, first in `next_generation`, is kept as it is.
+        if self._local_search is None:
+            return lap
+        offspring: SchedulePool = next_generation[1:]
+        self._local_search.improve_best(offspring)
+        next_generation[1:] = offspring
+        return clock.lap("local_search", lap)
@@ -0,0 +1,225 @@
+from multiprocessing import Pool
+from random import Random
+from typing import Dict, List, Optional, Tuple
+
+from constants import (
+    MIGRANTS,
+    MIGRATION_INTERVAL,
+    MIGRATION_TOPOLOGY,
+    POPULATION_SIZE,
+)
+from genetic_alg import EvolutionManager, Population, SchedulePool
+from local_search import LocalSearch
+from parallel import Genome, pack, unpack
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer
+from selection import Selection
+from stopping import RunController
+
+# Type Aliases
+IslandTask = Tuple[int, List[Genome], List[Genome], int]
+Topology = Dict[int, List[int]]
+
+# Worker state, set once per process by `_init_worker`. `_rng` is reseeded by every task.
+_problem: Optional[ProblemInstance] = None
+_manager: Optional[EvolutionManager] = None
+_rng: Random = Random()
+_population_size: int = POPULATION_SIZE
+
+
+def _init_worker(
+    problem: ProblemInstance,
+    mutation_rate: float,
+    crossover_rate: float,
+    population_size: int,
+    local_search: Optional[LocalSearch],
+    selection: Optional[Selection],
+) -> None:
+    global _problem, _manager, _population_size
+    _problem = problem
+    _manager = EvolutionManager(
+        mutation_rate, crossover_rate, local_search, _rng, selection=selection
+    )
+    _population_size = population_size
+
+
+def _worker_factory() -> ScheduleOptimizer:
+    return ScheduleOptimizer(_problem, _rng)
+
+
+def _evolve_island(task: IslandTask) -> List[Genome]:
+    """Runs one epoch of an island: takes in its immigrants, then evolves it for a few generations."""
+    task_seed, genomes, immigrants, generations = task
+    _rng.seed(task_seed)
+
+    if genomes:
+        schedules: SchedulePool = [unpack(_problem, _rng, genome) for genome in genomes]
+    else:
+        schedules = _manager.spawn(_population_size, _worker_factory)
+
+    population: Population = Population(
+        size=len(schedules), schedule_factory=_worker_factory, schedules=schedules
+    )
+    # Immigrants replace the worst residents, so the island keeps its size.
+    population.replace_worst([unpack(_problem, _rng, genome) for genome in immigrants])
+    for _ in range(generations):
+        population = _manager.evolve(population, _worker_factory)
+
+    return [pack(schedule) for schedule in population.schedules]
+
+
+def create_topology(islands: int, topology: str) -> Topology:
+    """
+    Maps every island to the islands it sends migrants to.
+
+    Args:
+        islands (int): Number of islands.
+        topology (str): "ring" sends to the next island only, "complete" to every other island.
+
+    Raises:
+        ValueError: If the topology is not known.
+    """
+    if topology == "ring":
+        return {island: [(island + 1) % islands] for island in range(islands)}
+    if topology == "complete":
+        return {
+            island: [other for other in range(islands) if other != island]
+            for island in range(islands)
+        }
+    raise ValueError(f"Unknown migration topology '{topology}'")
+
+
+class IslandModel:
+    """
+    Evolves several independent populations, one per process, with periodic migration.
+
+    Islands run in epochs of `migration_interval` generations. Between epochs the
+    `migrants` best schedules of each island are sent along the topology and replace
+    the worst schedules of their destination. Each epoch of each island gets its own
+    seed from the run's random stream `rng`, so a seeded run is reproducible.
+    The `local_search` and `selection` given to the constructor are used on every
+    island.
+
+    Attributes:
+        islands (int): Number of islands, and of worker processes.
+        migration_interval (int): Generations evolved between migrations.
+        migrants (int): Schedules each island sends to every destination.
+        topology (Dict[int, List[int]]): Destinations of every island's migrants.
+        rng (Random): Random stream of the run, from which every epoch seed is drawn.
+    """
+
+    def __init__(
+        self,
+        problem: ProblemInstance,
+        mutation_rate: float,
+        crossover_rate: float,
+        islands: int,
+        population_size: int = POPULATION_SIZE,
+        migration_interval: int = MIGRATION_INTERVAL,
+        migrants: int = MIGRANTS,
+        topology: str = MIGRATION_TOPOLOGY,
+        local_search: Optional[LocalSearch] = None,
+        rng: Optional[Random] = None,
+        selection: Optional[Selection] = None,
+    ) -> None:
+        if not islands > 1:
+            raise ValueError("Expected at least two islands")
+        if not migration_interval > 0:
+            raise ValueError("Expected a positive migration interval")
+        if not 0 <= migrants < population_size:
+            raise ValueError("Expected fewer migrants than schedules per island")
+
+        self._problem: ProblemInstance = problem
+        self.rng: Random = rng if rng is not None else Random()
+        self.islands: int = islands
+        self.migration_interval: int = migration_interval
+        self.migrants: int = migrants
+        self.topology: Topology = create_topology(islands, topology)
+        self._pool = Pool(
+            processes=islands,
+            initializer=_init_worker,
+            initargs=(
+                problem,
+                mutation_rate,
+                crossover_rate,
+                population_size,
+                local_search,
+                selection,
+            ),
+        )
+
+    def __enter__(self) -> "IslandModel":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def run(self, run_controller: Optional[RunController] = None) -> ScheduleOptimizer:
+        """
+        Evolves all islands and returns the best schedule found on any of them.
+
+        Stops once `run_controller` (by default one with the limits of `constants.py`)
+        says so; its limits are checked after every epoch, against the global best.
+        """
+        run_controller = run_controller or RunController()
+        run_controller.start()
+        populations: List[List[Genome]] = [[] for _ in range(self.islands)]
+        immigrants: List[List[Genome]] = [[] for _ in range(self.islands)]
+        best: Optional[Genome] = None
+        generation: int = 0
+
+        while generation < run_controller.generations:
+            epoch: int = min(
+                self.migration_interval, run_controller.generations - generation
+            )
+            tasks: List[IslandTask] = [
+                (
+                    self.rng.getrandbits(64),
+                    populations[island],
+                    immigrants[island],
+                    epoch,
+                )
+                for island in range(self.islands)
+            ]
+            populations = self._pool.map(_evolve_island, tasks)
+            generation += epoch
+            scheduled: int = sum(len(population) for population in populations)
+            if generation == epoch:
+                run_controller.add_evaluations(scheduled)  # The initial populations.
+            run_controller.add_evaluations(scheduled * epoch)
+
+            island_bests: List[Genome] = [
+                max(population, key=lambda genome: genome[2])
+                for population in populations
+            ]
+            print(
+                f"Generation {generation} -",
+                "Island Best Fitness:",
+                ", ".join(f"{genome[2]:.6f}" for genome in island_bests),
+                sep=" ",
+            )
+
+            epoch_best: Genome = max(island_bests, key=lambda genome: genome[2])
+            if best is None or epoch_best[2] > best[2]:
+                best = epoch_best
+            if run_controller.should_stop(generation, best[2]):
+                print(f"{run_controller.stop_reason} reached. Stopping evolution")
+                break
+
+            immigrants = self._migrate(populations)
+
+        return unpack(self._problem, self.rng, best)
+
+    def _migrate(self, populations: List[List[Genome]]) -> List[List[Genome]]:
+        immigrants: List[List[Genome]] = [[] for _ in range(self.islands)]
+        for island, destinations in self.topology.items():
+            emigrants: List[Genome] = sorted(
+                populations[island], key=lambda genome: genome[2], reverse=True
+            )[: self.migrants]
+            for destination in destinations:
+                immigrants[destination].extend(emigrants)
+        return immigrants
@@ -0,0 +1,213 @@
+from abc import ABC, abstractmethod
+from math import exp
+from timeit import default_timer as timer
+from typing import Dict, List, Optional, Tuple
+
+from constants import (
+    LOCAL_SEARCH_ITERATIONS,
+    LOCAL_SEARCH_TIME_BUDGET,
+    MEMETIC_OFFSPRING,
+)
+from schedule import Placement, ScheduleOptimizer
+
+# Type Aliases
+Schedules = List[ScheduleOptimizer]
+Move = Tuple[int, int, Placement]
+TabuList = Dict[Tuple[int, int], int]
+
+
+class LocalSearch(ABC):
+    """
+    Improves single schedules by relocating clashing or unplaced sessions one at a time.
+
+    Moves are priced with `ScheduleOptimizer.move_conflicts` before they are made, so an
+    iteration costs a handful of table lookups rather than a full evaluation. The
+    clashing and unplaced sessions are only looked up again after a move is made.
+    Random choices come from the schedule's own stream. Subclasses decide which moves
+    to make.
+
+    Attributes:
+        iterations (int): Moves tried per schedule.
+        offspring (int): Number of best offspring improved per generation.
+        time_budget (float): Seconds all improvements of one generation may take together.
+    """
+
+    def __init__(
+        self,
+        iterations: int = LOCAL_SEARCH_ITERATIONS,
+        offspring: int = MEMETIC_OFFSPRING,
+        time_budget: float = LOCAL_SEARCH_TIME_BUDGET,
+    ) -> None:
+        if not iterations > 0:
+            raise ValueError("Expected a positive number of iterations")
+        if not offspring >= 0:
+            raise ValueError("Expected a non-negative number of offspring")
+        if not time_budget > 0.0:
+            raise ValueError("Expected a positive time budget")
+
+        self.iterations: int = iterations
+        self.offspring: int = offspring
+        self.time_budget: float = time_budget
+
+    def improve_best(self, schedules: Schedules) -> None:
+        """Replaces the `offspring` fittest of `schedules` with their improved versions."""
+        deadline: float = timer() + self.time_budget
+        ranked: List[int] = sorted(
+            range(len(schedules)), key=lambda i: schedules[i].fitness, reverse=True
+        )
+        for index in ranked[: self.offspring]:
+            schedules[index] = self.improve(schedules[index], deadline)
+
+    @abstractmethod
+    def improve(
+        self, schedule: ScheduleOptimizer, deadline: float
+    ) -> ScheduleOptimizer:
+        """
+        Searches from `schedule`, which it changes, and returns the best schedule visited.
+
+        Stops after `iterations` moves, at `deadline` (a `timeit.default_timer` value), or
+        once no session is left clashing or unplaced.
+        """
+
+    @staticmethod
+    def _candidates(schedule: ScheduleOptimizer) -> List[int]:
+        return schedule.conflicting_sessions() + schedule.unplaced_sessions()
+
+
+class TabuSearch(LocalSearch):
+    """
+    Makes the best of a few sampled moves each iteration, even when it is worse.
+
+    Sending a session back to a slot it just left is tabu for `tenure` iterations,
+    unless it would beat the best schedule found so far.
+    """
+
+    def __init__(
+        self,
+        iterations: int = LOCAL_SEARCH_ITERATIONS,
+        offspring: int = MEMETIC_OFFSPRING,
+        time_budget: float = LOCAL_SEARCH_TIME_BUDGET,
+        neighbours: int = 8,
+        tenure: int = 10,
+    ) -> None:
+        super().__init__(iterations, offspring, time_budget)
+        self.neighbours: int = neighbours
+        self.tenure: int = tenure
+
+    def improve(
+        self, schedule: ScheduleOptimizer, deadline: float
+    ) -> ScheduleOptimizer:
+        best: ScheduleOptimizer = schedule.clone()
+        tabu: TabuList = {}
+        candidates: List[int] = self._candidates(schedule)
+
+        for iteration in range(self.iterations):
+            if not candidates or timer() > deadline:
+                break
+
+            move: Optional[Move] = self._best_move(
+                schedule, candidates, tabu, iteration, best.fitness
+            )
+            if move is None:
+                continue
+
+            _, index, placement = move
+            tabu[index, schedule.slot_genes[index]] = iteration + self.tenure
+            if schedule.move_session(index, *placement) > best.fitness:
+                best = schedule.clone()
+            candidates = self._candidates(schedule)
+
+        return best
+
+    def _best_move(
+        self,
+        schedule: ScheduleOptimizer,
+        candidates: List[int],
+        tabu: TabuList,
+        iteration: int,
+        best_fitness: float,
+    ) -> Optional[Move]:
+        best_move: Optional[Move] = None
+        for _ in range(self.neighbours):
+            index: int = schedule.rng.choice(candidates)
+            placement: Optional[Placement] = schedule.random_placement(index)
+            if placement is None:
+                continue
+
+            conflicts: int = schedule.move_conflicts(index, *placement)
+            if tabu.get((index, placement[0]), -1) >= iteration and not (
+                schedule.move_fitness(index, *placement) > best_fitness
+            ):
+                continue
+            if best_move is None or conflicts < best_move[0]:
+                best_move = conflicts, index, placement
+        return best_move
+
+
+class SimulatedAnnealing(LocalSearch):
+    """
+    Makes one random move per iteration, always when it removes conflicts and with
+    probability exp(-added conflicts / temperature) otherwise. The temperature starts
+    at `temperature` and is multiplied by `cooling` every iteration.
+    """
+
+    def __init__(
+        self,
+        iterations: int = LOCAL_SEARCH_ITERATIONS,
+        offspring: int = MEMETIC_OFFSPRING,
+        time_budget: float = LOCAL_SEARCH_TIME_BUDGET,
+        temperature: float = 1.0,
+        cooling: float = 0.95,
+    ) -> None:
+        super().__init__(iterations, offspring, time_budget)
+        if not temperature > 0.0:
+            raise ValueError("Expected a positive temperature")
+        if not 0.0 < cooling <= 1.0:
+            raise ValueError("Expected a cooling factor in (0, 1]")
+
+        self.temperature: float = temperature
+        self.cooling: float = cooling
+
+    def improve(
+        self, schedule: ScheduleOptimizer, deadline: float
+    ) -> ScheduleOptimizer:
+        best: ScheduleOptimizer = schedule.clone()
+        temperature: float = self.temperature
+        candidates: List[int] = self._candidates(schedule)
+
+        for _ in range(self.iterations):
+            if not candidates or timer() > deadline:
+                break
+
+            index: int = schedule.rng.choice(candidates)
+            placement: Optional[Placement] = schedule.random_placement(index)
+            if placement is not None:
+                conflicts: int = schedule.move_conflicts(index, *placement)
+                accepted: bool = conflicts <= 0 or schedule.rng.random() < exp(
+                    -conflicts / temperature
+                )
+                if accepted:
+                    if schedule.move_session(index, *placement) > best.fitness:
+                        best = schedule.clone()
+                    candidates = self._candidates(schedule)
+            temperature *= self.cooling
+
+        return best
+
+
+def create_local_search(method: str, offspring: int = MEMETIC_OFFSPRING) -> LocalSearch:
+    """
+    Creates the local search used by the memetic mode.
+
+    Args:
+        method (str): "tabu" for `TabuSearch`, "annealing" for `SimulatedAnnealing`.
+        offspring (int): Number of best offspring improved per generation.
+
+    Raises:
+        ValueError: If the method is not known.
+    """
+    if method == "tabu":
+        return TabuSearch(offspring=offspring)
+    if method == "annealing":
+        return SimulatedAnnealing(offspring=offspring)
+    raise ValueError(f"Unknown local search '{method}'")
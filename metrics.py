@@ -0,0 +1,94 @@
+import json
+from timeit import default_timer as timer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TextIO
+
+import numpy as np
+
+from schedule import ScheduleOptimizer
+
+# Type Aliases
+Event = Dict[str, Any]
+Listener = Callable[[Event], None]
+PhaseTimes = Dict[str, float]
+
+
+class Metrics:
+    """
+    Event stream of a run: every event is a dict, written as one JSON line to `stream`
+    and passed to every listener.
+
+    A `Metrics` with neither a stream nor listeners is disabled; callers check
+    `enabled` before computing anything worth reporting, so a disabled instance costs
+    a single attribute test per generation.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, listeners: Iterable[Listener] = ()
+    ) -> None:
+        self.stream: Optional[TextIO] = stream
+        self.listeners: List[Listener] = list(listeners)
+
+    @property
+    def enabled(self) -> bool:
+        return self.stream is not None or bool(self.listeners)
+
+    def add_listener(self, listener: Listener) -> None:
+        self.listeners.append(listener)
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        record: Event = {"event": event, **fields}
+        if self.stream is not None:
+            self.stream.write(json.dumps(record) + "\n")
+        for listener in self.listeners:
+            listener(record)
+
+
+class PhaseClock:
+    """
+    Adds up the wall-clock time spent in named phases of a generation.
+
+    `lap(phase, since)` charges the time from `since` to now to `phase` and returns
+    now, so consecutive phases chain. A disabled clock never reads the timer.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled: bool = enabled
+        self.phases: PhaseTimes = {}
+
+    def now(self) -> float:
+        return timer() if self.enabled else 0.0
+
+    def lap(self, phase: str, since: float) -> float:
+        if not self.enabled:
+            return 0.0
+        now: float = timer()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - since
+        return now
+
+
+def gene_diversity(schedules: Sequence[ScheduleOptimizer]) -> float:
+    """
+    Mean fraction of sessions two schedules of `schedules` place differently (another
+    slot or room), over all pairs; 0.0 for identical schedules.
+    """
+    if len(schedules) < 2:
+        return 0.0
+
+    slots: np.ndarray = np.stack(
+        [np.frombuffer(schedule.slot_genes, np.int16) for schedule in schedules]
+    ).astype(np.int64)
+    rooms: np.ndarray = np.stack(
+        [np.frombuffer(schedule.room_genes, np.int16) for schedule in schedules]
+    ).astype(np.int64)
+    # One key per (session, slot, room); shifted by one so `UNPLACED` is a value too.
+    placements: np.ndarray = (slots + 1) * (rooms.max() + 2) + rooms + 1
+    keys: np.ndarray = np.arange(slots.shape[1]) * (placements.max() + 1) + placements
+
+    _, counts = np.unique(keys, return_counts=True)
+    equal_pairs: int = int((counts * (counts - 1) // 2).sum())
+    pairs: int = slots.shape[1] * len(schedules) * (len(schedules) - 1) // 2
+    return 1.0 - equal_pairs / pairs
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from secrets import choice
+from random import Random
 from string import ascii_uppercase, digits
 from typing import List, Optional
 
@@ -13,17 +13,23 @@ from constants import (
 )
 
 
-def generate_id(n: int) -> str:
-    return "".join(choice(ascii_uppercase + digits) for _ in range(n))
+def generate_id(n: int, rng: Random) -> str:
+    return "".join(rng.choices(ascii_uppercase + digits, k=n))
 
 
 class TimeSlot:
-    def __init__(self, day: str, start: datetime, duration: timedelta) -> None:
-        self.slot_id: str = generate_id(n=4)
+    def __init__(
+        self, slot_id: int, day: str, start: datetime, duration: timedelta
+    ) -> None:
+        self.slot_id: int = slot_id
         self.day: str = day
         self.start: datetime = start
         self.duration: timedelta = duration
 
+    @property
+    def end(self) -> datetime:
+        return self.start + self.duration
+
     def __repr__(self) -> str:
         return (
             f"TimeSlot("
@@ -37,14 +43,17 @@ class TimeSlot:
 
 class Professor:
     def __init__(
-        self, available_start: datetime, available_end: datetime, name: str
+        self,
+        available_start: datetime,
+        available_end: datetime,
+        name: str,
+        professor_id: str,
     ) -> None:
         self.name: str = name
-        self.professor_id: str = generate_id(n=4)
+        self.professor_id: str = professor_id
         self.available_start: datetime = available_start
         self.available_end: datetime = available_end
         self.courses: List[Course] = []
-        self._reserved_slots: List[TimeSlot] = []
 
     def __repr__(self) -> str:
         return (
@@ -54,24 +63,14 @@ class Professor:
             f"available_end='{self.available_end:%H:%M}',"
         )
 
-    def is_reserved(self, time_slot: TimeSlot) -> bool:
-        return any(
-            [
-                not self._is_within_availability(time_slot),
-                self._overlaps_with_lunch_break(time_slot),
-                self._overlaps_with_first_break(time_slot),
-                self._overlaps_with_second_break(time_slot),
-                time_slot in self._reserved_slots,
-            ]
+    def is_available(self, time_slot: TimeSlot) -> bool:
+        return not (
+            not self._is_within_availability(time_slot)
+            or self._overlaps_with_lunch_break(time_slot)
+            or self._overlaps_with_first_break(time_slot)
+            or self._overlaps_with_second_break(time_slot)
         )
 
-    def reserve_professor(self, time_slot: TimeSlot) -> None:
-        if self.is_reserved(time_slot):
-            raise ValueError(
-                f"Cannot reserve Dr. {self.name} from {time_slot.start} to {time_slot.start + time_slot.duration}"
-            )
-        self._reserved_slots.append(time_slot)
-
     def assign_course(self, course: "Course", lab: bool = False) -> None:
         if lab:
             if course.lab_professor is None or course.lab_professor == self:
@@ -121,31 +120,23 @@ class Professor:
 class Room:
     def __init__(self, number: str) -> None:
         self.number: str = number
-        self._reserved_slots: List[TimeSlot] = []
 
     def __repr__(self) -> str:
-        return f"Room(number='{self.number}', reserved_slots='{len(self._reserved_slots)}')"
-
-    def is_reserved(self, time_slot: TimeSlot) -> bool:
-        return time_slot in self._reserved_slots
-
-    def reserve_room(self, time_slot: TimeSlot) -> None:
-        if self.is_reserved(time_slot):
-            raise ValueError(f"Room {self.number} is already booked at {time_slot}")
-        self._reserved_slots.append(time_slot)
+        return f"Room(number='{self.number}')"
 
 
 class Course:
     def __init__(
         self,
         title: str,
+        code: str,
         weekly_lectures: int,
         weekly_labs: int = 0,
         assigned_professor: Optional[Professor] = None,
         lab_professor: Optional[Professor] = None,
     ) -> None:
         self.title: str = title
-        self.code = generate_id(n=8)
+        self.code: str = code
         self.weekly_lectures: int = weekly_lectures
         self.weekly_labs: int = weekly_labs
         self.assigned_professor: Optional[Professor] = assigned_professor
@@ -0,0 +1,303 @@
+from random import Random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import NSGA2_OBJECTIVES, NSGA2_SORT_BLOCK
+from constraints import ProfessorGaps
+from evaluation import BatchEvaluator, batch_evaluator
+from fitness_cache import FitnessCache
+from genetic_alg import EvolutionManager, Population, SchedFactory, SchedulePool
+from local_search import LocalSearch
+from metrics import Metrics, PhaseClock
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer
+from selection import Selection, TournamentSelection
+from timeslots import num_days, periods_per_day
+
+# Type Aliases
+ObjectiveArray = np.ndarray
+Ranks = np.ndarray
+Column = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+class Objectives:
+    """
+    Objective vectors of schedules for multi-objective optimization, all minimized.
+
+    Each objective is one column of a (schedules x objectives) integer array, computed
+    for the whole population in one NumPy pass like `BatchEvaluator`:
+
+    - "conflicts": hard conflicts, as counted by `BatchEvaluator`.
+    - "rooms_used": distinct rooms booked; fewer means better room utilization.
+    - "professor_gaps": idle teachable periods within professors' days (compactness).
+    - "student_day_length": periods from the first to the last booking of every
+      student group on every day it has classes, summed.
+
+    Attributes:
+        names (Tuple[str, ...]): The objectives, in column order.
+    """
+
+    def __init__(
+        self, problem: ProblemInstance, names: Sequence[str] = NSGA2_OBJECTIVES
+    ) -> None:
+        self._evaluator: BatchEvaluator = batch_evaluator(problem)
+        self._num_rooms: int = len(problem.all_rooms)
+        self._num_student_groups: int = len(problem.student_groups)
+        self._professor_gaps = ProfessorGaps()
+        self._professor_gaps.compile(problem)
+
+        columns: Dict[str, Column] = {
+            "conflicts": self._evaluator.conflicts,
+            "rooms_used": self._rooms_used,
+            "professor_gaps": lambda slots, rooms: self._professor_gaps.evaluate(slots),
+            "student_day_length": lambda slots, rooms: self._student_day_length(slots),
+        }
+        if not names:
+            raise ValueError("Expected at least one objective")
+        for name in names:
+            if name not in columns:
+                raise ValueError(f"Unknown objective '{name}'")
+
+        self.names: Tuple[str, ...] = tuple(names)
+        self._columns: List[Column] = [columns[name] for name in self.names]
+
+    def evaluate(self, schedules: Sequence[ScheduleOptimizer]) -> ObjectiveArray:
+        slots: np.ndarray = self._evaluator.stack([s.slot_genes for s in schedules])
+        rooms: np.ndarray = self._evaluator.stack([s.room_genes for s in schedules])
+        return self.evaluate_genes(slots, rooms)
+
+    def evaluate_genes(self, slots: np.ndarray, rooms: np.ndarray) -> ObjectiveArray:
+        slots = slots.astype(np.int64)
+        rooms = rooms.astype(np.int64)
+        return np.stack(
+            [column(slots, rooms).astype(np.int64) for column in self._columns], axis=1
+        )
+
+    def _rooms_used(self, slots: np.ndarray, rooms: np.ndarray) -> np.ndarray:
+        placed: np.ndarray = slots >= 0
+        rows: np.ndarray = np.nonzero(placed)[0]
+        used: np.ndarray = np.zeros((len(slots), self._num_rooms), dtype=bool)
+        used[rows, rooms[placed]] = True
+        return used.sum(axis=1)
+
+    def _student_day_length(self, slots: np.ndarray) -> np.ndarray:
+        evaluator: BatchEvaluator = self._evaluator
+        placed: np.ndarray = slots >= 0
+        periods: np.ndarray = evaluator.slot_period_table[np.where(placed, slots, 0)][
+            :, evaluator.pair_session
+        ]
+        booked: np.ndarray = placed[:, evaluator.pair_session, None] & (periods >= 0)
+        rows, pairs, positions = np.nonzero(booked)
+        if not len(rows):
+            return np.zeros(len(slots), dtype=np.int64)
+
+        period: np.ndarray = periods[rows, pairs, positions]
+        keys: np.ndarray = (
+            rows * self._num_student_groups + evaluator.pair_student_group[pairs]
+        ) * num_days + period // periods_per_day
+
+        # Sorted by (schedule, group, day) then period, each day's first and last
+        # booking are the ends of its run of equal keys.
+        order: np.ndarray = np.lexsort((period, keys))
+        keys, period, rows = keys[order], period[order], rows[order]
+        first: np.ndarray = np.r_[True, keys[1:] != keys[:-1]]
+        last: np.ndarray = np.r_[keys[1:] != keys[:-1], True]
+        return np.bincount(
+            rows[first],
+            weights=period[last] - period[first] + 1,
+            minlength=len(slots),
+        ).astype(np.int64)
+
+
+def non_dominated_sort(objectives: ObjectiveArray) -> Ranks:
+    """
+    Pareto rank of every row of a (n x objectives) array, all minimized: 0 for the
+    rows no other row dominates, 1 for those dominated only by rank 0, and so on.
+
+    Identical rows are ranked once. The domination matrix of the distinct rows is
+    built in blocks of `NSGA2_SORT_BLOCK` rows and each front is peeled off it with
+    one vector subtraction, so the O(n^2) work is done by NumPy, not per pair.
+    """
+    distinct, inverse = np.unique(objectives, axis=0, return_inverse=True)
+    n: int = len(distinct)
+    dominates: np.ndarray = np.empty((n, n), dtype=bool)
+    for start in range(0, n, NSGA2_SORT_BLOCK):
+        block: np.ndarray = distinct[start : start + NSGA2_SORT_BLOCK]
+        no_worse: np.ndarray = np.ones((len(block), n), dtype=bool)
+        better: np.ndarray = np.zeros((len(block), n), dtype=bool)
+        for column in range(distinct.shape[1]):
+            no_worse &= block[:, column, None] <= distinct[:, column]
+            better |= block[:, column, None] < distinct[:, column]
+        dominates[start : start + NSGA2_SORT_BLOCK] = no_worse & better
+
+    dominated_by: np.ndarray = dominates.sum(axis=0)
+    ranks: Ranks = np.full(n, -1, dtype=np.int64)
+    front: np.ndarray = np.flatnonzero(dominated_by == 0)
+    rank: int = 0
+    while len(front):
+        ranks[front] = rank
+        dominated_by -= dominates[front].sum(axis=0)
+        front = np.flatnonzero((dominated_by == 0) & (ranks < 0))
+        rank += 1
+    return ranks[inverse.ravel()]
+
+
+def crowding_distance(objectives: ObjectiveArray, ranks: Ranks) -> np.ndarray:
+    """
+    NSGA-II crowding distance of every row within its front: the sum over objectives of
+    the gap between its two neighbours, relative to the front's range. The extremes of
+    every front are infinitely far. All fronts are handled at once, one sort per objective.
+    """
+    n: int = len(objectives)
+    distance: np.ndarray = np.zeros(n, dtype=np.float64)
+    if not n:
+        return distance
+
+    for values in objectives.T.astype(np.float64):
+        order: np.ndarray = np.lexsort((values, ranks))
+        sorted_values: np.ndarray = values[order]
+        sorted_ranks: Ranks = ranks[order]
+        first: np.ndarray = np.r_[True, sorted_ranks[1:] != sorted_ranks[:-1]]
+        last: np.ndarray = np.r_[sorted_ranks[1:] != sorted_ranks[:-1], True]
+
+        fronts: np.ndarray = np.cumsum(first) - 1
+        span: np.ndarray = (sorted_values[last] - sorted_values[first])[fronts]
+        gap: np.ndarray = np.zeros(n, dtype=np.float64)
+        gap[1:-1] = sorted_values[2:] - sorted_values[:-2]
+        contribution: np.ndarray = np.divide(
+            gap, span, out=np.zeros(n, dtype=np.float64), where=span > 0
+        )
+        contribution[first | last] = np.inf
+        distance[order] += contribution
+    return distance
+
+
+def crowded_order(ranks: Ranks, distance: np.ndarray) -> np.ndarray:
+    """Indices from best to worst: by rank, then from the most to the least isolated."""
+    return np.lexsort((-distance, ranks))
+
+
+class NSGA2Manager(EvolutionManager):
+    """
+    An `EvolutionManager` that evolves the population under NSGA-II, keeping the
+    objectives of `Objectives` apart instead of ranking by the scalar fitness.
+
+    Parents are drawn by `selection` over the crowded order of the population (rank
+    first, then crowding distance), so the default binary tournament is the crowded
+    tournament of NSGA-II. As many offspring as there are parents are bred, and the
+    next generation is the best half of parents and offspring in crowded order,
+    which keeps every non-dominated schedule found while there is room for it.
+
+    The scalar fitness of every schedule is still evaluated, so stopping limits, the
+    fitness cache, checkpoints and `Population.get_best_schedule` work as usual.
+
+    Attributes:
+        objectives (Objectives): The objectives being traded off.
+        front (List[ScheduleOptimizer]): Non-dominated schedules of the last population
+            returned by `evolve`.
+        front_objectives (np.ndarray): Objective vectors of `front`, one row each.
+    """
+
+    def __init__(
+        self,
+        problem: ProblemInstance,
+        mutation_rate: float,
+        crossover_rate: float,
+        objectives: Sequence[str] = NSGA2_OBJECTIVES,
+        local_search: Optional[LocalSearch] = None,
+        rng: Optional[Random] = None,
+        metrics: Optional[Metrics] = None,
+        fitness_cache: Optional[FitnessCache] = None,
+        selection: Optional[Selection] = None,
+    ) -> None:
+        """
+        Args:
+            problem (ProblemInstance): The problem every schedule belongs to.
+            objectives (Sequence[str]): Names of the objectives, see `Objectives`.
+            selection (Optional[Selection]): Parent selection over the crowded order; a
+                binary `TournamentSelection` when omitted.
+
+        The remaining arguments are those of `EvolutionManager`.
+
+        Raises:
+            ValueError: If a rate is not a positive float or an objective is not known.
+        """
+        super().__init__(
+            mutation_rate,
+            crossover_rate,
+            local_search=local_search,
+            rng=rng,
+            metrics=metrics,
+            fitness_cache=fitness_cache,
+            selection=selection if selection is not None else TournamentSelection(2),
+        )
+        self.objectives: Objectives = Objectives(problem, objectives)
+        self.front: SchedulePool = []
+        self.front_objectives: ObjectiveArray = np.empty(
+            (0, len(self.objectives.names)), dtype=np.int64
+        )
+
+    def evolve(
+        self, population: Population, schedule_factory: SchedFactory
+    ) -> Population:
+        """
+        Breeds one generation of offspring and keeps the best `population.size` of
+        parents and offspring by Pareto rank and crowding distance.
+        """
+        clock = PhaseClock(self._timed)
+        lap: float = clock.now()
+        parent_scores: ObjectiveArray = self.objectives.evaluate(population.schedules)
+        ranks: Ranks = non_dominated_sort(parent_scores)
+        order: np.ndarray = crowded_order(
+            ranks, crowding_distance(parent_scores, ranks)
+        )
+        # Position in the crowded order as a fitness to select on: the best weighs n.
+        crowded: np.ndarray = np.empty(len(order), dtype=np.float64)
+        crowded[order] = np.arange(len(order), 0, -1)
+        picks: List[int] = self._selection.select(
+            crowded, 2 * population.size, self.rng
+        )
+        lap = clock.lap("selection", lap)
+
+        offspring: SchedulePool = []
+        for first, second in zip(picks[::2], picks[1::2]):
+            child: ScheduleOptimizer = self.crossover(
+                population.schedules[first],
+                population.schedules[second],
+                schedule_factory,
+            )
+            lap = clock.lap("crossover", lap)
+            self.mutate(child)
+            lap = clock.lap("mutation", lap)
+            offspring.append(child)
+        if self._local_search is not None:
+            self._local_search.improve_best(offspring)
+            lap = clock.lap("local_search", lap)
+
+        Population(
+            size=len(offspring),
+            schedule_factory=schedule_factory,
+            schedules=offspring,
+        ).evaulaute_fitness()
+        lap = clock.lap("evaluation", lap)
+
+        pool: SchedulePool = population.schedules + offspring
+        scores: ObjectiveArray = np.concatenate(
+            [parent_scores, self.objectives.evaluate(offspring)]
+        )
+        ranks = non_dominated_sort(scores)
+        survivors: np.ndarray = crowded_order(ranks, crowding_distance(scores, ranks))[
+            : population.size
+        ]
+        front: np.ndarray = survivors[ranks[survivors] == 0]
+        self.front = [pool[index] for index in front]
+        self.front_objectives = scores[front]
+        clock.lap("sorting", lap)
+        self.phase_times = clock.phases
+
+        return Population(
+            size=population.size,
+            schedule_factory=schedule_factory,
+            schedules=[pool[index] for index in survivors],
+        )
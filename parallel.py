@@ -0,0 +1,193 @@
+from multiprocessing import Pool
+from random import Random
+from typing import List, Optional, Sequence, Tuple
+
+from constants import WORKER_CHUNK_SIZE
+from evaluation import batch_evaluator
+from fitness_cache import Genome
+from genetic_alg import EvolutionManager, Population, SchedFactory, SchedulePool
+from local_search import LocalSearch
+from metrics import Metrics, PhaseClock
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer
+from selection import Selection
+
+# Type Aliases
+GenomePair = Tuple[Genome, Genome]
+SpawnTask = Tuple[int, int]
+BreedTask = Tuple[int, List[GenomePair]]
+
+# Worker state, set once per process by `_init_worker`. `_rng` is reseeded by every task.
+_problem: Optional[ProblemInstance] = None
+_manager: Optional[EvolutionManager] = None
+_rng: Random = Random()
+
+
+def pack(schedule: ScheduleOptimizer) -> Genome:
+    return (
+        schedule.slot_genes.tobytes(),
+        schedule.room_genes.tobytes(),
+        schedule.fitness,
+    )
+
+
+def unpack(problem: ProblemInstance, rng: Random, genome: Genome) -> ScheduleOptimizer:
+    slot_genes, room_genes, fitness = genome
+    return ScheduleOptimizer.from_genes(problem, rng, slot_genes, room_genes, fitness)
+
+
+def _init_worker(
+    problem: ProblemInstance, mutation_rate: float, crossover_rate: float
+) -> None:
+    global _problem, _manager
+    _problem = problem
+    _manager = EvolutionManager(mutation_rate, crossover_rate, rng=_rng)
+
+
+def _worker_factory() -> ScheduleOptimizer:
+    return ScheduleOptimizer(_problem, _rng)
+
+
+def _score(schedules: SchedulePool) -> None:
+    stale: SchedulePool = [s for s in schedules if s.fitness < 0.0]
+    if stale:
+        for schedule, fitness in zip(stale, batch_evaluator(_problem).evaluate(stale)):
+            schedule.fitness = fitness
+
+
+def _spawn_chunk(task: SpawnTask) -> List[Genome]:
+    task_seed, count = task
+    _rng.seed(task_seed)
+    return [pack(_worker_factory().create_schedule()) for _ in range(count)]
+
+
+def _breed_chunk(task: BreedTask) -> List[Genome]:
+    task_seed, pairs = task
+    _rng.seed(task_seed)
+
+    offspring: SchedulePool = []
+    for genome_a, genome_b in pairs:
+        child: ScheduleOptimizer = _manager.crossover(
+            unpack(_problem, _rng, genome_a),
+            unpack(_problem, _rng, genome_b),
+            _worker_factory,
+        )
+        _manager.mutate(child)
+        offspring.append(child)
+
+    _score(offspring)
+    return [pack(child) for child in offspring]
+
+
+class ParallelEvolutionManager(EvolutionManager):
+    """
+    An `EvolutionManager` that creates and scores offspring in a pool of worker processes.
+
+    The problem definition is handed to each worker once, when the pool starts; tasks
+    only carry the raw gene bytes of parents and offspring. Work is cut into chunks of
+    a fixed size, each with its own seed drawn from the run's random stream: a worker
+    reseeds its own stream with it, so a seeded run produces the same populations
+    whatever the number of workers.
+    """
+
+    def __init__(
+        self,
+        problem: ProblemInstance,
+        mutation_rate: float,
+        crossover_rate: float,
+        workers: int,
+        chunk_size: int = WORKER_CHUNK_SIZE,
+        local_search: Optional[LocalSearch] = None,
+        rng: Optional[Random] = None,
+        metrics: Optional[Metrics] = None,
+        selection: Optional[Selection] = None,
+    ) -> None:
+        """
+        Initializes the manager and starts its worker pool.
+
+        Args:
+            problem (ProblemInstance): The problem every schedule is built for.
+            mutation_rate (float): The probability of mutation (must be > 0.0).
+            crossover_rate (float): The probability of crossover (must be > 0.0).
+            workers (int): Number of worker processes (must be > 0).
+            chunk_size (int): Number of offspring created per task (must be > 0).
+            local_search (Optional[LocalSearch]): Enables the memetic mode when given; it runs
+                in the main process, on the best offspring returned by the workers.
+            rng (Optional[Random]): Random stream of the run; task seeds are drawn from it.
+            metrics (Optional[Metrics]): Turns on phase timing when given and enabled.
+            selection (Optional[Selection]): Parent selection, made in the main process.
+
+        Raises:
+            ValueError: If a rate is not a positive float, or workers/chunk_size is not positive.
+        """
+        super().__init__(
+            mutation_rate,
+            crossover_rate,
+            local_search,
+            rng,
+            metrics,
+            selection=selection,
+        )
+        if not workers > 0:
+            raise ValueError("Expected a positive number of workers")
+        if not chunk_size > 0:
+            raise ValueError("Expected a positive chunk size")
+
+        self._problem: ProblemInstance = problem
+        self._chunk_size: int = chunk_size
+        self._pool = Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(problem, mutation_rate, crossover_rate),
+        )
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def spawn(self, count: int, schedule_factory: SchedFactory) -> SchedulePool:
+        tasks: List[SpawnTask] = [
+            (self.rng.getrandbits(64), min(self._chunk_size, count - start))
+            for start in range(0, count, self._chunk_size)
+        ]
+        return self._collect(self._pool.map(_spawn_chunk, tasks))
+
+    def evolve(
+        self, population: Population, schedule_factory: SchedFactory
+    ) -> Population:
+        # Crossover, mutation and scoring all happen in the workers: one "breeding" phase.
+        clock = PhaseClock(self._timed)
+        lap: float = clock.now()
+        pairs: List[GenomePair] = [
+            (pack(parent_a), pack(parent_b))
+            for parent_a, parent_b in population.select_parents(
+                population.size - 1, self._selection, self.rng
+            )
+        ]
+        tasks: List[BreedTask] = [
+            (self.rng.getrandbits(64), pairs[start : start + self._chunk_size])
+            for start in range(0, len(pairs), self._chunk_size)
+        ]
+        lap = clock.lap("selection", lap)
+
+        next_generation: SchedulePool = [population.get_best_schedule()]
+        next_generation.extend(self._collect(self._pool.map(_breed_chunk, tasks)))
+        lap = clock.lap("breeding", lap)
+        lap = self._improve_offspring(next_generation, clock, lap)
+
+        new_population: Population = Population(
+            size=population.size,
+            schedule_factory=schedule_factory,
+            schedules=next_generation,
+        )
+        new_population.evaulaute_fitness()
+        clock.lap("evaluation", lap)
+        self.phase_times = clock.phases
+        return new_population
+
+    def _collect(self, chunks: Sequence[List[Genome]]) -> SchedulePool:
+        return [
+            unpack(self._problem, self.rng, genome)
+            for chunk in chunks
+            for genome in chunk
+        ]
@@ -0,0 +1,237 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from bitset import mask_of
+from constraints import SoftConstraint, SoftConstraints, create_soft_constraints
+from models import Course, Department, Division, Professor, Room
+from timeslots import lab_slot_mask, lecture_slot_mask, time_slots
+
+# Type Aliases
+RoomCatalog = Tuple[Room, ...]
+DepartmentCatalog = Tuple[Department, ...]
+DivisionCatalog = Tuple[Division, ...]
+ProfessorCatalog = Tuple[Professor, ...]
+IndexTable = Tuple[int, ...]
+Priority = Tuple[int, int, int]
+StudentGroup = Tuple[Department, Division, Optional[int]]
+
+# Room pools, indices into `ProblemInstance.room_pools`.
+LECTURE_POOL: int = 0
+LAB_POOL: int = 1
+
+
+class Session(NamedTuple):
+    """
+    A single required meeting of a course: one weekly lecture of a division, or
+    one weekly lab of a batch within a division.
+
+    Sessions have a fixed position in `ProblemInstance.sessions`, which is the
+    gene index a schedule stores its room and time slot under.
+    """
+
+    department: Department
+    course: Course
+    division: Division
+    batch: Optional[int]
+    occurrence: int
+    professor: Professor
+
+    @property
+    def is_lab(self) -> bool:
+        return self.batch is not None
+
+
+class ProblemInstance:
+    """
+    Read-only description of a timetabling problem.
+
+    A single instance is built once per run (see `data.load_data`) and shared by
+    every `ScheduleOptimizer`, so creating an individual never touches the disk
+    or rebuilds the university entities. Anything that changes per individual
+    (bookings, gene values, fitness) lives on the schedule instead.
+
+    Attributes:
+        rooms (Tuple[Room, ...]): Lecture rooms, in input order.
+        lab_rooms (Tuple[Room, ...]): Lab rooms, in input order.
+        all_rooms (Tuple[Room, ...]): Lecture rooms followed by lab rooms; room genes index into it.
+        room_pools (Tuple[int, ...]): Per room pool (`LECTURE_POOL`, `LAB_POOL`), a bitset over
+            `all_rooms` of the rooms a session of that pool may be booked in.
+        departments (Tuple[Department, ...]): Departments with their offered courses.
+        divisions (Tuple[Division, ...]): Divisions every department is scheduled for.
+        professors (Tuple[Professor, ...]): Professors, in input order.
+        sessions (Tuple[Session, ...]): Every session a complete timetable must contain.
+        session_professor (Tuple[int, ...]): Index into `professors` of each session's teacher.
+        session_group (Tuple[int, ...]): Count group of each session, one group per
+            course lectures of a division or course labs of a batch.
+        group_sizes (Tuple[int, ...]): Number of sessions each count group requires per week.
+        group_is_lab (Tuple[bool, ...]): Whether each count group is made of lab sessions.
+        student_groups (Tuple[Tuple[Department, Division, Optional[int]], ...]): Groups of
+            students that cannot be in two places at once: every batch of a division of a
+            department, or the whole division (batch None) when it has no batches.
+        session_student_groups (Tuple[Tuple[int, ...], ...]): Indices into `student_groups`
+            of the students attending each session: all batches of its division for a
+            lecture, its own batch for a lab.
+        session_blocks (Tuple[Tuple[int, int], ...]): [start, stop) ranges of the sessions of
+            each course and division, which are stored contiguously.
+        professor_forbidden (Tuple[int, ...]): Per professor, a bitset over `time_slots` of the
+            slots outside their availability or overlapping a break.
+        session_pool (Tuple[int, ...]): Room pool each session is booked from.
+        session_slots (Tuple[int, ...]): Per session, a bitset over `time_slots` of the slots of
+            its kind (lecture or lab) its professor is available for.
+        session_priority (Tuple[Tuple[int, int, int], ...]): Placement priority of each session,
+            lowest first: its number of feasible slots, minus the sessions its professor
+            teaches, minus the batches of its division.
+        soft_constraints (SoftConstraints): The soft penalty terms of the fitness, compiled;
+            by default the built-in terms weighted by `SOFT_CONSTRAINT_WEIGHTS`.
+    """
+
+    def __init__(
+        self,
+        rooms: Iterable[Room],
+        lab_rooms: Iterable[Room],
+        departments: Iterable[Department],
+        divisions: Iterable[Division],
+        professors: Iterable[Professor],
+        soft_constraints: Optional[Iterable[SoftConstraint]] = None,
+    ) -> None:
+        self.rooms: RoomCatalog = tuple(rooms)
+        self.lab_rooms: RoomCatalog = tuple(lab_rooms)
+        self.all_rooms: RoomCatalog = self.rooms + self.lab_rooms
+        self.room_pools: IndexTable = (
+            mask_of(range(len(self.rooms))),
+            mask_of(range(len(self.rooms), len(self.all_rooms))),
+        )
+        self.departments: DepartmentCatalog = tuple(departments)
+        self.divisions: DivisionCatalog = tuple(divisions)
+        self.professors: ProfessorCatalog = tuple(professors)
+        self.professor_forbidden: IndexTable = tuple(
+            mask_of(
+                index
+                for index, slot in enumerate(time_slots)
+                if not prof.is_available(slot)
+            )
+            for prof in self.professors
+        )
+
+        sessions: List[Session] = []
+        session_group: List[int] = []
+        group_sizes: List[int] = []
+        group_is_lab: List[bool] = []
+        session_blocks: List[Tuple[int, int]] = []
+
+        for dept in self.departments:
+            for course in dept.offered_courses:
+                for division in self.divisions:
+                    block_start: int = len(sessions)
+                    if course.assigned_professor is not None:
+                        group_sizes.append(course.weekly_lectures)
+                        group_is_lab.append(False)
+                        for occurrence in range(course.weekly_lectures):
+                            sessions.append(
+                                Session(
+                                    dept,
+                                    course,
+                                    division,
+                                    None,
+                                    occurrence,
+                                    course.assigned_professor,
+                                )
+                            )
+                            session_group.append(len(group_sizes) - 1)
+
+                    if course.lab_professor is None or course.weekly_labs == 0:
+                        session_blocks.append((block_start, len(sessions)))
+                        continue
+
+                    first_group: int = len(group_sizes)
+                    group_sizes.extend([course.weekly_labs] * division.num_batches)
+                    group_is_lab.extend([True] * division.num_batches)
+                    for occurrence in range(course.weekly_labs):
+                        for batch in range(1, division.num_batches + 1):
+                            sessions.append(
+                                Session(
+                                    dept,
+                                    course,
+                                    division,
+                                    batch,
+                                    occurrence,
+                                    course.lab_professor,
+                                )
+                            )
+                            session_group.append(first_group + batch - 1)
+                    session_blocks.append((block_start, len(sessions)))
+
+        professor_index: Dict[int, int] = {
+            id(prof): index for index, prof in enumerate(self.professors)
+        }
+        self.sessions: Tuple[Session, ...] = tuple(sessions)
+        self.session_professor: IndexTable = tuple(
+            professor_index[id(session.professor)] for session in self.sessions
+        )
+        self.session_group: IndexTable = tuple(session_group)
+        self.group_sizes: IndexTable = tuple(group_sizes)
+        self.group_is_lab: Tuple[bool, ...] = tuple(group_is_lab)
+
+        student_groups: List[StudentGroup] = []
+        division_groups: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        for dept in self.departments:
+            for division in self.divisions:
+                first: int = len(student_groups)
+                student_groups.extend(
+                    (dept, division, batch)
+                    for batch in range(1, division.num_batches + 1) or (None,)
+                )
+                division_groups[id(dept), id(division)] = tuple(
+                    range(first, len(student_groups))
+                )
+        self.student_groups: Tuple[StudentGroup, ...] = tuple(student_groups)
+        self.session_student_groups: Tuple[IndexTable, ...] = tuple(
+            (
+                division_groups[id(session.department), id(session.division)][
+                    session.batch - 1 : session.batch
+                ]
+                if session.is_lab
+                else division_groups[id(session.department), id(session.division)]
+            )
+            for session in self.sessions
+        )
+        self.session_blocks: Tuple[Tuple[int, int], ...] = tuple(
+            block for block in session_blocks if block[0] < block[1]
+        )
+        self.session_pool: IndexTable = tuple(
+            LAB_POOL if session.is_lab else LECTURE_POOL for session in self.sessions
+        )
+        self.session_slots: IndexTable = tuple(
+            (lab_slot_mask if session.is_lab else lecture_slot_mask)
+            & ~self.professor_forbidden[professor]
+            for session, professor in zip(self.sessions, self.session_professor)
+        )
+
+        professor_sessions: List[int] = [0] * len(self.professors)
+        for professor in self.session_professor:
+            professor_sessions[professor] += 1
+        self.session_priority: Tuple[Priority, ...] = tuple(
+            (
+                slots.bit_count(),
+                -professor_sessions[professor],
+                -session.division.num_batches,
+            )
+            for session, professor, slots in zip(
+                self.sessions, self.session_professor, self.session_slots
+            )
+        )
+        self.soft_constraints: SoftConstraints = SoftConstraints(
+            self,
+            create_soft_constraints() if soft_constraints is None else soft_constraints,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ProblemInstance("
+            f"rooms={len(self.rooms)}, "
+            f"lab_rooms={len(self.lab_rooms)}, "
+            f"departments={len(self.departments)}, "
+            f"divisions={len(self.divisions)}, "
+            f"professors={len(self.professors)}, "
+            f"sessions={len(self.sessions)}"
+            f")"
+        )
@@ -1,313 +1,719 @@
-from collections import defaultdict
-from datetime import datetime
-from random import choice
-from typing import DefaultDict, List, Optional, Tuple, Set
-
-from constants import (
-    DAYS_OF_WEEK,
-    LAB_TIME_SLOT_DURATION,
-    LUNCH_BREAK_END,
-    LUNCH_BREAK_START,
-    TIME_SLOT_DURATION,
-    UNIVERSITY_END_TIME,
-    UNIVERSITY_START_TIME,
+from array import array
+from copy import copy
+from random import Random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bitset import bits, choose_bit
+from constraints import DAY_MASK, Penalties, SoftConstraints
+from fitness_cache import GenomeHash, gene_key, genome_hash
+from models import ScheduledClass
+from problem import ProblemInstance, Session
+from timeslots import (
+    blocked_slots,
+    num_days,
+    num_periods,
+    periods_per_day,
+    slot_days,
+    slot_period_masks,
+    slot_periods,
+    time_slots,
 )
-from models import Course, Department, Division, Room, ScheduledClass, TimeSlot
 
 # Type Aliases
-TimeSlots = List[TimeSlot]
 ScheduledClasses = List[ScheduledClass]
-Rooms = List[Room]
-Departments = List[Department]
-Divisions = Set[Division]
-DefaultConfCounter = DefaultDict[Tuple[str, str], int]
-LecConfCounter = DefaultDict[Tuple[str, int], int]
-LabConfCounter = DefaultDict[Tuple[str, int], DefaultDict[int, int]]
+Genes = array
+LoadTable = array
+Bitsets = List[int]
+MoveDelta = Tuple[int, int]
+Keys = Tuple[int, ...]
+Placement = Tuple[int, int]
+ConflictBreakdown = Dict[str, int]
 
 # Nullable Types
-NullableTimeSlot = Optional[TimeSlot]
-NullableRoom = Optional[Room]
-
-
-def create_timeslots() -> TimeSlots:
-    populated_time_slots: TimeSlots = []
-
-    for day in DAYS_OF_WEEK:
-        current_time: datetime = UNIVERSITY_START_TIME
-        while current_time + TIME_SLOT_DURATION <= UNIVERSITY_END_TIME:
-            if LUNCH_BREAK_START <= current_time < LUNCH_BREAK_END:
-                current_time += TIME_SLOT_DURATION
-                continue
-
-            populated_time_slots.append(
-                TimeSlot(
-                    day=day,
-                    start=current_time,
-                    duration=TIME_SLOT_DURATION,
-                )
-            )
-
-            if current_time + LAB_TIME_SLOT_DURATION <= UNIVERSITY_END_TIME:
-                populated_time_slots.append(
-                    TimeSlot(
-                        day=day,
-                        start=current_time,
-                        duration=LAB_TIME_SLOT_DURATION,
-                    )
-                )
-
-            current_time += TIME_SLOT_DURATION
+NullableRoom = Optional[int]
+
+# Gene value of a session that could not be placed.
+UNPLACED: int = -1
+
+
+def fitness_from_scores(conflicts: int, penalty: int) -> float:
+    """
+    Fitness from the hard conflict count and the weighted soft penalty: 1.0 for neither,
+    falling towards 0.0 as they grow. The whole soft penalty weighs less than a single
+    conflict, so fewer conflicts always rank first.
+    """
+    return 1.0 / (1.0 + conflicts + penalty / (1.0 + penalty))
+
+
+def is_feasible(fitness: float) -> bool:
+    """Whether a schedule of this fitness has no hard conflicts (soft penalties aside)."""
+    return fitness > 0.5
+
+
+def hard_conflicts(fitness: float) -> int:
+    """Hard conflicts of a schedule of this fitness; inverts `fitness_from_scores`."""
+    # 1 / fitness - 1 is the conflict count plus a soft part in [0, 1); the margin only
+    # absorbs rounding.
+    return int(1.0 / fitness - 1.0 + 1e-9)
+
+
+class Occupancy:
+    """
+    Booking counters of a single schedule, kept in step with its genes.
+
+    `room_load` and `professor_load` count the sessions booked per (room, period)
+    and (professor, period), where a period is one of the atomic periods of
+    `timeslots.slot_periods`, so overlapping lecture and lab slots share them.
+    `group_counts` counts the placed sessions of each count group. The running
+    `clashes` and `shortfall` totals make the conflict count of a schedule, and
+    of any single-session move, an O(1) lookup.
+
+    `penalty` is the running weighted total of the problem's soft constraints.
+    Their compiled tables are looked up with the professor's day bitset (cut
+    from `professor_busy`), the `group_day_counts` of the session's count group
+    and its slot, so keeping it current adds a few lookups per booking.
+
+    `student_load` counts the sessions each student group (see
+    `ProblemInstance.student_groups`) attends per period; a lecture books every
+    batch of its division, so a batch's lab clashes with its division's lecture.
+
+    `room_busy` (per period, a bitset over rooms), `professor_busy` (per
+    professor, a bitset over periods) and `student_busy` (per student group, a
+    bitset over periods) index the same bookings for placement: checking a
+    reservation is a bit test, the free rooms of a slot are one mask
+    intersection, and the periods a session's students are free one union.
+    `room_clashing`, `professor_clashing` and `student_clashing` mark, the same
+    way, the bookings shared by more than one session, so whether a session
+    clashes is a few bit tests too.
+    """
+
+    def __init__(self, problem: ProblemInstance) -> None:
+        self.problem: ProblemInstance = problem
+        self.room_load: LoadTable = array("h", [0]) * (
+            len(problem.all_rooms) * num_periods
+        )
+        self.professor_load: LoadTable = array("h", [0]) * (
+            len(problem.professors) * num_periods
+        )
+        self.student_load: LoadTable = array("h", [0]) * (
+            len(problem.student_groups) * num_periods
+        )
+        self.group_counts: LoadTable = array("h", [0]) * len(problem.group_sizes)
+        self.group_day_counts: LoadTable = array("h", [0]) * (
+            len(problem.group_sizes) * num_days
+        )
+        self.room_busy: Bitsets = [0] * num_periods
+        self.professor_busy: Bitsets = [0] * len(problem.professors)
+        self.student_busy: Bitsets = [0] * len(problem.student_groups)
+        self.room_clashing: Bitsets = [0] * num_periods
+        self.professor_clashing: Bitsets = [0] * len(problem.professors)
+        self.student_clashing: Bitsets = [0] * len(problem.student_groups)
+        self.placed: int = 0
+        self.clashes: int = 0
+        self.shortfall: int = sum(problem.group_sizes)
+        self.penalty: int = 0
+
+    @property
+    def conflicts(self) -> int:
+        return self.clashes + self.shortfall
+
+    def copy(self) -> "Occupancy":
+        twin: Occupancy = copy(self)
+        twin.room_load = array("h", self.room_load)
+        twin.professor_load = array("h", self.professor_load)
+        twin.student_load = array("h", self.student_load)
+        twin.group_counts = array("h", self.group_counts)
+        twin.group_day_counts = array("h", self.group_day_counts)
+        twin.room_busy = list(self.room_busy)
+        twin.professor_busy = list(self.professor_busy)
+        twin.student_busy = list(self.student_busy)
+        twin.room_clashing = list(self.room_clashing)
+        twin.professor_clashing = list(self.professor_clashing)
+        twin.student_clashing = list(self.student_clashing)
+        return twin
+
+    def add(self, index: int, slot: int, room: int) -> bool:
+        """Books session `index` at (slot, room); True if the booking clashes."""
+        clashes: int = self.clashes
+        professor: int = self.problem.session_professor[index]
+        groups: Keys = self.problem.session_student_groups[index]
+        day_penalty: int = self._day_penalty(self.professor_busy[professor], slot)
+        for period in slot_periods[slot]:
+            room_key: int = room * num_periods + period
+            professor_key: int = professor * num_periods + period
+            room_load: int = self.room_load[room_key]
+            professor_load: int = self.professor_load[professor_key]
+
+            self.clashes += (room_load > 0) + (professor_load > 0)
+            if not room_load:
+                self.room_busy[period] |= 1 << room
+            elif room_load == 1:
+                self.room_clashing[period] |= 1 << room
+            if not professor_load:
+                self.professor_busy[professor] |= 1 << period
+            elif professor_load == 1:
+                self.professor_clashing[professor] |= 1 << period
+
+            self.room_load[room_key] = room_load + 1
+            self.professor_load[professor_key] = professor_load + 1
+
+            for group in groups:
+                student_key: int = group * num_periods + period
+                student_load: int = self.student_load[student_key]
+                self.clashes += student_load > 0
+                if not student_load:
+                    self.student_busy[group] |= 1 << period
+                elif student_load == 1:
+                    self.student_clashing[group] |= 1 << period
+                self.student_load[student_key] = student_load + 1
+        self.penalty += self._day_penalty(self.professor_busy[professor], slot)
+        self.penalty -= day_penalty
+        self._count(index, slot, 1)
+        return self.clashes > clashes
+
+    def remove(self, index: int, slot: int, room: int) -> None:
+        professor: int = self.problem.session_professor[index]
+        groups: Keys = self.problem.session_student_groups[index]
+        day_penalty: int = self._day_penalty(self.professor_busy[professor], slot)
+        for period in slot_periods[slot]:
+            room_key: int = room * num_periods + period
+            professor_key: int = professor * num_periods + period
+            room_load: int = self.room_load[room_key]
+            professor_load: int = self.professor_load[professor_key]
+
+            self.clashes -= (room_load > 1) + (professor_load > 1)
+            if room_load == 1:
+                self.room_busy[period] &= ~(1 << room)
+            elif room_load == 2:
+                self.room_clashing[period] &= ~(1 << room)
+            if professor_load == 1:
+                self.professor_busy[professor] &= ~(1 << period)
+            elif professor_load == 2:
+                self.professor_clashing[professor] &= ~(1 << period)
+
+            self.room_load[room_key] = room_load - 1
+            self.professor_load[professor_key] = professor_load - 1
+
+            for group in groups:
+                student_key = group * num_periods + period
+                student_load = self.student_load[student_key]
+                self.clashes -= student_load > 1
+                if student_load == 1:
+                    self.student_busy[group] &= ~(1 << period)
+                elif student_load == 2:
+                    self.student_clashing[group] &= ~(1 << period)
+                self.student_load[student_key] = student_load - 1
+        self.penalty += self._day_penalty(self.professor_busy[professor], slot)
+        self.penalty -= day_penalty
+        self._count(index, slot, -1)
+
+    def is_clashing(self, index: int, slot: int, room: int) -> bool:
+        """
+        Whether session `index`, booked at (slot, room), shares a room, professor or
+        student group period.
+        """
+        periods: int = slot_period_masks[slot]
+        if self.professor_clashing[self.problem.session_professor[index]] & periods:
+            return True
+        for group in self.problem.session_student_groups[index]:
+            if self.student_clashing[group] & periods:
+                return True
+        return any(
+            self.room_clashing[period] >> room & 1 for period in slot_periods[slot]
+        )
 
-    return populated_time_slots
+    def move_delta(
+        self, index: int, old_slot: int, old_room: int, slot: int, room: int
+    ) -> MoveDelta:
+        """
+        Change in (conflicts, placed sessions) if session `index` moved from
+        (old_slot, old_room) to (slot, room). Either end may be `UNPLACED`.
+        """
+        conflicts: int = 0
+        placed: int = 0
+        old_room_keys: Keys = ()
+        old_professor_keys: Keys = ()
+        old_student_keys: Keys = ()
+
+        if old_slot != UNPLACED:
+            old_room_keys, old_professor_keys, old_student_keys = self._keys(
+                index, old_slot, old_room
+            )
+            conflicts -= sum(self.room_load[key] > 1 for key in old_room_keys)
+            conflicts -= sum(self.professor_load[key] > 1 for key in old_professor_keys)
+            conflicts -= sum(self.student_load[key] > 1 for key in old_student_keys)
+            placed -= 1
+
+        if slot != UNPLACED:
+            room_keys, professor_keys, student_keys = self._keys(index, slot, room)
+            # Loads are read as if the session had already left its old bookings.
+            conflicts += sum(
+                self.room_load[key] - (key in old_room_keys) > 0 for key in room_keys
+            )
+            conflicts += sum(
+                self.professor_load[key] - (key in old_professor_keys) > 0
+                for key in professor_keys
+            )
+            conflicts += sum(
+                self.student_load[key] - (key in old_student_keys) > 0
+                for key in student_keys
+            )
+            placed += 1
+
+        if placed:
+            group: int = self.problem.session_group[index]
+            required: int = self.problem.group_sizes[group]
+            count: int = self.group_counts[group]
+            conflicts += abs(required - count - placed) - abs(required - count)
+
+        return conflicts, placed
+
+    def move_penalty(self, index: int, old_slot: int, slot: int) -> int:
+        """
+        Change in the soft penalty if session `index` moved from `old_slot` to `slot`.
+        Either may be `UNPLACED`; rooms do not matter to soft constraints.
+        """
+        if old_slot == slot:
+            return 0
+
+        soft: SoftConstraints = self.problem.soft_constraints
+        professor: int = self.problem.session_professor[index]
+        group: int = self.problem.session_group[index]
+        busy: int = self.professor_busy[professor]
+        moved_busy: int = busy
+        day_steps: Dict[int, int] = {}
+        penalty: int = 0
+
+        if old_slot != UNPLACED:
+            for period in slot_periods[old_slot]:
+                if self.professor_load[professor * num_periods + period] == 1:
+                    moved_busy &= ~(1 << period)
+            day_steps[slot_days[old_slot]] = -1
+            penalty -= soft.session_slot_table[index][old_slot]
+        if slot != UNPLACED:
+            moved_busy |= slot_period_masks[slot]
+            day_steps[slot_days[slot]] = day_steps.get(slot_days[slot], 0) + 1
+            penalty += soft.session_slot_table[index][slot]
+
+        for day, step in day_steps.items():
+            shift: int = day * periods_per_day
+            penalty += soft.professor_day_table[moved_busy >> shift & DAY_MASK]
+            penalty -= soft.professor_day_table[busy >> shift & DAY_MASK]
+            count: int = self.group_day_counts[group * num_days + day]
+            penalty += soft.group_day_table[count + step]
+            penalty -= soft.group_day_table[count]
+        return penalty
+
+    def _day_penalty(self, busy: int, slot: int) -> int:
+        """Soft penalty of the day of `slot` for a professor teaching the periods `busy`."""
+        day_busy: int = busy >> slot_days[slot] * periods_per_day & DAY_MASK
+        return self.problem.soft_constraints.professor_day_table[day_busy]
+
+    def _keys(self, index: int, slot: int, room: int) -> Tuple[Keys, Keys, Keys]:
+        professor: int = self.problem.session_professor[index]
+        groups: Keys = self.problem.session_student_groups[index]
+        periods: Tuple[int, ...] = slot_periods[slot]
+        return (
+            tuple(room * num_periods + period for period in periods),
+            tuple(professor * num_periods + period for period in periods),
+            tuple(
+                group * num_periods + period for group in groups for period in periods
+            ),
+        )
 
+    def _count(self, index: int, slot: int, step: int) -> None:
+        group: int = self.problem.session_group[index]
+        required: int = self.problem.group_sizes[group]
+        count: int = self.group_counts[group]
+        self.shortfall += abs(required - count - step) - abs(required - count)
+        self.group_counts[group] = count + step
+        self.placed += step
 
-time_slots: TimeSlots = create_timeslots()
+        soft: SoftConstraints = self.problem.soft_constraints
+        day_key: int = group * num_days + slot_days[slot]
+        day_count: int = self.group_day_counts[day_key]
+        self.penalty += soft.group_day_table[day_count + step]
+        self.penalty -= soft.group_day_table[day_count]
+        self.penalty += step * soft.session_slot_table[index][slot]
+        self.group_day_counts[day_key] = day_count + step
 
 
 class ScheduleOptimizer:
-    def __init__(self) -> None:
-        self.raw_schedule: ScheduledClasses = []
-        self.rooms: Rooms = []
-        self.lab_rooms: Rooms = []
-        self.departments: Departments = []
-        self.divisions: Divisions = set()
+    """
+    A candidate timetable encoded as two integer genes per required session.
+
+    `slot_genes[i]` and `room_genes[i]` hold the index into `time_slots` and
+    `problem.all_rooms` of `problem.sessions[i]`, or `UNPLACED` when the session
+    could not be booked. The entities themselves only live in the shared
+    `ProblemInstance`; `raw_schedule` materializes `ScheduledClass` objects on
+    demand for display.
+
+    A schedule built by `create_schedule` or changed through `move_session`
+    keeps its `Occupancy` tables alive, so its fitness stays current and
+    `move_fitness` can price a single-session move without committing it.
+    Writing genes in bulk (`inherit`) drops the tables and marks the fitness
+    stale (-1.0) until the schedule is evaluated again.
+
+    Schedules are copy-on-write: `clone` returns a twin sharing the gene
+    buffers and tables, and whichever of the two is changed first takes its
+    own copy. Offspring passed through unchanged cost one small object, and
+    changing one can never rewrite its parent or the elite.
+
+    Every random choice of a schedule (initial placement, random moves) is drawn
+    from `rng`, the random stream of the run it belongs to; `repair` may be given
+    a stream of its own.
+
+    `genome_hash` identifies the genes for `fitness_cache.FitnessCache`. It is
+    computed on first use and then updated by every `move_session` at the cost
+    of two XORs; bulk writes that are not whole copies drop it again.
+
+    `conflicting_sessions` scans every session once and then keeps its result as
+    a superset of the clashing sessions: a move to a placement nobody else books
+    cannot make any session clash, so later calls only recheck that list. A move
+    into a clash, or a bulk write, drops it.
+    """
+
+    def __init__(self, problem: ProblemInstance, rng: Random) -> None:
+        self.problem: ProblemInstance = problem
+        self.rng: Random = rng
+        self.slot_genes: Genes = array("h", [UNPLACED]) * len(problem.sessions)
+        self.room_genes: Genes = array("h", [UNPLACED]) * len(problem.sessions)
         self.fitness: float = -1.0
+        self._occupancy: Optional[Occupancy] = None
+        self._shared: bool = False
+        self._hash: Optional[GenomeHash] = None
+        self._clashing: Optional[List[int]] = None
 
     def __repr__(self) -> str:
         return f"Schedule Object of fitness: {self.fitness}"
 
-    def register_room(self, new_room: Room) -> None:
-        self.rooms.append(new_room)
+    @classmethod
+    def from_genes(
+        cls,
+        problem: ProblemInstance,
+        rng: Random,
+        slot_genes: bytes,
+        room_genes: bytes,
+        fitness: float = -1.0,
+    ) -> "ScheduleOptimizer":
+        """Rebuilds a schedule from the raw bytes of its slot and room genes."""
+        schedule = cls(problem, rng)
+        schedule.slot_genes = array("h", slot_genes)
+        schedule.room_genes = array("h", room_genes)
+        schedule.fitness = fitness
+        return schedule
+
+    def clone(self) -> "ScheduleOptimizer":
+        """Returns a copy sharing this schedule's genes until either of them changes."""
+        twin: ScheduleOptimizer = copy(self)
+        self._shared = twin._shared = True
+        return twin
+
+    @property
+    def raw_schedule(self) -> ScheduledClasses:
+        return [
+            self._materialize(index)
+            for index, slot in enumerate(self.slot_genes)
+            if slot != UNPLACED
+        ]
 
-    def register_lab_room(self, new_room: Room) -> None:
-        self.lab_rooms.append(new_room)
+    @property
+    def genome_hash(self) -> GenomeHash:
+        if self._hash is None:
+            self._hash = genome_hash(self.slot_genes, self.room_genes)
+        return self._hash
 
-    def register_department(self, new_dept: Department) -> None:
-        self.departments.append(new_dept)
+    def placed_sessions(self) -> List[int]:
+        return [index for index, slot in enumerate(self.slot_genes) if slot != UNPLACED]
 
-    def register_division(self, new_division: Division) -> None:
-        self.divisions.add(new_division)
+    def inherit(
+        self, parent: "ScheduleOptimizer", start: int = 0, stop: Optional[int] = None
+    ) -> None:
+        """Copies the genes of `parent` for the sessions in [start, stop)."""
+        self._occupancy = None
+        self._own()
+        self.slot_genes[start:stop] = parent.slot_genes[start:stop]
+        self.room_genes[start:stop] = parent.room_genes[start:stop]
+        self.fitness = -1.0
+        self._hash = parent._hash if start == 0 and stop is None else None
+        self._clashing = None
+
+    @property
+    def occupancy(self) -> Occupancy:
+        if self._occupancy is None:
+            occupancy = Occupancy(self.problem)
+            for index, (slot, room) in enumerate(zip(self.slot_genes, self.room_genes)):
+                if slot != UNPLACED:
+                    occupancy.add(index, slot, room)
+            self._occupancy = occupancy
+        return self._occupancy
 
     def create_schedule(self) -> "ScheduleOptimizer":
-        self.raw_schedule.clear()
-
-        for department in self.departments:
-            self._schedule_department(department, self.divisions)
-
+        """
+        Builds a schedule constructively, most constrained sessions first.
+
+        Sessions are taken in `problem.session_priority` order, ties in random order.
+        Each goes to a random free (slot, room) among its feasible slots or, when none
+        is free, to the feasible placement adding the fewest conflicts, so only sessions
+        whose professor is never available for them are left unplaced.
+        """
+        self.slot_genes = array("h", [UNPLACED]) * len(self.problem.sessions)
+        self.room_genes = array("h", [UNPLACED]) * len(self.problem.sessions)
+        self._occupancy = Occupancy(self.problem)
+        self._shared = False
+        self._hash = None
+        self._clashing = None
+
+        order: List[int] = list(range(len(self.problem.sessions)))
+        self.rng.shuffle(order)
+        order.sort(key=self.problem.session_priority.__getitem__)
+        for index in order:
+            placement: Optional[Placement] = self._find_free_placement(
+                index, self.rng
+            ) or self._least_conflicting_placement(index)
+            if placement is not None:
+                self.move_session(index, *placement)
+
+        self.fitness = self._occupancy_fitness()
         return self
 
-    def book_and_add_class(
-        self,
-        div: Division,
-        department: Department,
-        course: Course,
-        time_slot: TimeSlot,
-        room: Room,
-        batch: Optional[str] = None,
-    ) -> None:
-        room.reserve_room(time_slot)
-
-        if batch is not None and course.lab_professor is not None:
-            course.lab_professor.reserve_professor(time_slot)
-            self.raw_schedule.append(
-                ScheduledClass(
-                    div=div,
-                    batch=f"Batch {batch}",
-                    dept=department,
-                    course=course,
-                    time_slot=time_slot,
-                    room=room,
-                    prof=course.lab_professor,
-                )
-            )
-            return
+    def move_fitness(self, index: int, slot: int, room: int) -> float:
+        """Fitness this schedule would have if session `index` moved to (slot, room)."""
+        occupancy: Occupancy = self.occupancy
+        conflicts, _ = occupancy.move_delta(
+            index, self.slot_genes[index], self.room_genes[index], slot, room
+        )
+        penalty: int = occupancy.move_penalty(index, self.slot_genes[index], slot)
+        return fitness_from_scores(
+            occupancy.conflicts + conflicts, occupancy.penalty + penalty
+        )
 
-        if course.assigned_professor is not None:
-            course.assigned_professor.reserve_professor(time_slot)
-            self.raw_schedule.append(
-                ScheduledClass(
-                    div=div,
-                    batch="All",
-                    dept=department,
-                    course=course,
-                    time_slot=time_slot,
-                    room=room,
-                    prof=course.assigned_professor,
-                )
+    def move_conflicts(self, index: int, slot: int, room: int) -> int:
+        """Change in the conflict count if session `index` moved to (slot, room)."""
+        conflicts, _ = self.occupancy.move_delta(
+            index, self.slot_genes[index], self.room_genes[index], slot, room
+        )
+        return conflicts
+
+    def move_session(self, index: int, slot: int, room: int) -> float:
+        """Moves session `index` to (slot, room) and returns the updated fitness."""
+        self._own()
+        occupancy: Occupancy = self.occupancy
+        if self.slot_genes[index] != UNPLACED:
+            occupancy.remove(index, self.slot_genes[index], self.room_genes[index])
+        if slot != UNPLACED and occupancy.add(index, slot, room):
+            self._clashing = None  # Sessions it now clashes with may not be listed.
+        if self._hash is not None:
+            self._hash ^= gene_key(
+                index, self.slot_genes[index], self.room_genes[index]
+            ) ^ gene_key(index, slot, room)
+
+        self.slot_genes[index] = slot
+        self.room_genes[index] = room
+        self.fitness = self._occupancy_fitness()
+        return self.fitness
+
+    def unplaced_sessions(self) -> List[int]:
+        return [index for index, slot in enumerate(self.slot_genes) if slot == UNPLACED]
+
+    def random_placement(self, index: int) -> Optional[Placement]:
+        """A random feasible slot for session `index`, with a room of its pool free then if any."""
+        slots: int = self.problem.session_slots[index]
+        pool_rooms: int = self.problem.room_pools[self.problem.session_pool[index]]
+        if not slots or not pool_rooms:
+            return None
+        slot: int = choose_bit(slots, self.rng)
+        return slot, self._preferred_room(slot, pool_rooms)
+
+    def conflicting_sessions(self) -> List[int]:
+        """Placed sessions sharing a room, professor or student group period with another."""
+        occupancy: Occupancy = self.occupancy
+        candidates: Iterable[int] = (
+            range(len(self.slot_genes)) if self._clashing is None else self._clashing
+        )
+        self._clashing = [
+            index
+            for index in candidates
+            if self.slot_genes[index] != UNPLACED
+            and occupancy.is_clashing(
+                index, self.slot_genes[index], self.room_genes[index]
             )
-            return
+        ]
+        return self._clashing
+
+    def repair(self, rng: Optional[Random] = None) -> float:
+        """
+        Greedily moves clashing and unplaced sessions to a (slot, room) free for the
+        room, the professor and the students, and returns the updated fitness.
+
+        Sessions are taken in index order and each is relocated at most once; those
+        without a free placement keep the one they had. Free placements are drawn
+        from `rng`, or from the schedule's own stream when it is None.
+        """
+        rng = self.rng if rng is None else rng
+        occupancy: Occupancy = self.occupancy
+        clashing: List[int] = self.conflicting_sessions()
+        for index in clashing + self.unplaced_sessions():
+            slot, room = self.slot_genes[index], self.room_genes[index]
+            if slot != UNPLACED and not occupancy.is_clashing(index, slot, room):
+                continue  # Already resolved by an earlier move.
+
+            self.move_session(index, UNPLACED, UNPLACED)
+            placement: Optional[Placement] = self._find_free_placement(index, rng)
+            self.move_session(index, *(placement or (slot, room)))
+
+        # Sessions only moved to free placements or back, so no new clash can appear.
+        self._clashing = clashing
+        self.fitness = self._occupancy_fitness()
+        return self.fitness
 
     def calculate_fitness(self) -> float:
-        conflicts = (
-            self._check_room_conflicts()
-            + self._check_professor_conflicts()
-            + self._check_lab_conflicts()
-            + self._check_lecture_conflicts()
+        conflicts = sum(self.conflict_breakdown().values())
+        penalty = sum(self.penalty_breakdown().values())
+        return fitness_from_scores(conflicts, penalty)
+
+    def conflict_breakdown(self) -> ConflictBreakdown:
+        """Conflicts of every kind counted by `calculate_fitness`, recounted from the genes."""
+        return {
+            "room": self._check_room_conflicts(),
+            "professor": self._check_professor_conflicts(),
+            "student": self._check_student_conflicts(),
+            "lab_count": self._check_lab_conflicts(),
+            "lecture_count": self._check_lecture_conflicts(),
+        }
+
+    def penalty_breakdown(self) -> Penalties:
+        """Weighted penalty of every soft constraint, recounted from the genes."""
+        return self.problem.soft_constraints.breakdown(
+            np.frombuffer(self.slot_genes, np.int16).astype(np.int64)
         )
-        max_conflicts = len(self.raw_schedule) * (len(self.raw_schedule) - 1) // 2
-        return max(0.0, 1.0 - (conflicts / max_conflicts))
 
-    def _schedule_department(
-        self, department: Department, divisions: Divisions
-    ) -> None:
-        for course in department.offered_courses:
-            for division in divisions:
-                self._schedule_course_lectures(course, division, department)
-                self._schedule_course_labs(course, division, department)
-
-    def _schedule_course_lectures(
-        self, course: Course, division: Division, dept: Department
-    ) -> None:
-        lecture_slots: TimeSlots = [
-            slot
-            for slot in time_slots
-            if slot.duration == TIME_SLOT_DURATION
-            and (
-                course.assigned_professor is None
-                or not course.assigned_professor.is_reserved(slot)
-            )
-        ]
-        if not lecture_slots:
+    def _own(self) -> None:
+        """Takes a private copy of the genes and tables before they are changed."""
+        if not self._shared:
             return
+        self.slot_genes = array("h", self.slot_genes)
+        self.room_genes = array("h", self.room_genes)
+        if self._occupancy is not None:
+            self._occupancy = self._occupancy.copy()
+        self._shared = False
+
+    def _occupancy_fitness(self) -> float:
+        occupancy: Occupancy = self.occupancy
+        return fitness_from_scores(occupancy.conflicts, occupancy.penalty)
+
+    def _materialize(self, index: int) -> ScheduledClass:
+        session: Session = self.problem.sessions[index]
+        return ScheduledClass(
+            div=session.division,
+            batch=f"Batch {session.batch}" if session.is_lab else "All",
+            dept=session.department,
+            course=session.course,
+            room=self.problem.all_rooms[self.room_genes[index]],
+            prof=session.professor,
+            time_slot=time_slots[self.slot_genes[index]],
+        )
 
-        for _ in range(course.weekly_lectures):
-            random_lecture_slot: NullableTimeSlot = self._choose_random_time_slot(
-                lecture_slots
-            )
-            for _ in range(10):
-                if (
-                    course.assigned_professor is not None
-                    and random_lecture_slot is not None
-                    and not course.assigned_professor.is_reserved(random_lecture_slot)
-                ):
-                    break
-                random_lecture_slot = self._choose_random_time_slot(lecture_slots)
-            else:
-                continue  # Skip this iteration and go the next.
-
-            random_room: NullableRoom = self._choose_available_room(random_lecture_slot)
-
-            if random_room is None:
-                continue  # Skip iteration
-
-            self.book_and_add_class(
-                div=division,
-                department=dept,
-                course=course,
-                time_slot=random_lecture_slot,
-                room=random_room,
+    def _find_free_placement(self, index: int, rng: Random) -> Optional[Placement]:
+        professor: int = self.problem.session_professor[index]
+        pool: int = self.problem.session_pool[index]
+        busy: int = self.occupancy.professor_busy[professor]
+        for group in self.problem.session_student_groups[index]:
+            busy |= self.occupancy.student_busy[group]
+        candidate_slots: int = self.problem.session_slots[index] & ~blocked_slots(busy)
+
+        while candidate_slots:
+            slot: int = choose_bit(candidate_slots, rng)
+            room: NullableRoom = self._choose_available_room(slot, pool, rng)
+            if room is not None:
+                return slot, room
+            candidate_slots &= ~(1 << slot)
+        return None
+
+    def _least_conflicting_placement(self, index: int) -> Optional[Placement]:
+        """Among the feasible slots of session `index`, a placement adding the fewest conflicts."""
+        pool_rooms: int = self.problem.room_pools[self.problem.session_pool[index]]
+        best: List[Placement] = []
+        best_conflicts: int = 0
+        if not pool_rooms:
+            return None
+
+        for slot in bits(self.problem.session_slots[index]):
+            room: int = self._preferred_room(slot, pool_rooms)
+            conflicts, _ = self.occupancy.move_delta(
+                index, UNPLACED, UNPLACED, slot, room
             )
+            if not best or conflicts < best_conflicts:
+                best, best_conflicts = [(slot, room)], conflicts
+            elif conflicts == best_conflicts:
+                best.append((slot, room))
 
-    def _schedule_course_labs(
-        self, course: Course, div: Division, dept: Department
-    ) -> None:
-        lab_slots: TimeSlots = [
-            slot
-            for slot in time_slots
-            if slot.duration == LAB_TIME_SLOT_DURATION
-            and (
-                course.lab_professor is None
-                or not course.lab_professor.is_reserved(slot)
-            )
-        ]
+        return self.rng.choice(best) if best else None
 
-        if not lab_slots:
-            return
+    def _choose_available_room(self, slot: int, pool: int, rng: Random) -> NullableRoom:
+        available_rooms: int = self.problem.room_pools[pool] & ~self._busy_rooms(slot)
+        return choose_bit(available_rooms, rng) if available_rooms else None
 
-        for _ in range(course.weekly_labs):
-            for batch in range(1, div.num_batches + 1):
-                random_lab_slot: NullableTimeSlot = self._choose_random_time_slot(
-                    lab_slots
-                )
-                for _ in range(10):
-                    if (
-                        course.lab_professor is not None
-                        and random_lab_slot is not None
-                        and not course.lab_professor.is_reserved(random_lab_slot)
-                    ):
-                        break
-                    random_lab_slot = self._choose_random_time_slot(lab_slots)
-                else:
-                    continue
-
-                random_room: NullableRoom = self._choose_available_room(random_lab_slot)
-
-                if random_room is None:
-                    print("Can't find randomized room for scheduling a lab slot.")
-                    continue
-
-                self.book_and_add_class(
-                    div=div,
-                    batch=str(batch),
-                    department=dept,
-                    time_slot=random_lab_slot,
-                    course=course,
-                    room=random_room,
-                )
-
-    def _choose_available_room(self, time_slot: TimeSlot) -> NullableRoom:
-        available_rooms: Rooms = [
-            room for room in self.rooms if not room.is_reserved(time_slot)
-        ]
-        return choice(available_rooms) if available_rooms else None
+    def _preferred_room(self, slot: int, pool_rooms: int) -> int:
+        free_rooms: int = pool_rooms & ~self._busy_rooms(slot)
+        return choose_bit(free_rooms or pool_rooms, self.rng)
 
-    @staticmethod
-    def _choose_random_time_slot(time_slots: TimeSlots) -> NullableTimeSlot:
-        return choice(time_slots) if time_slots else None
+    def _busy_rooms(self, slot: int) -> int:
+        busy: int = 0
+        for period in slot_periods[slot]:
+            busy |= self.occupancy.room_busy[period]
+        return busy
 
     def _check_room_conflicts(self) -> int:
-        conflicts: DefaultConfCounter = defaultdict(int)
-        for scheduled_class in self.raw_schedule:
-            room_time_key = (
-                scheduled_class.room.number,
-                scheduled_class.time_slot.slot_id,
-            )
-            conflicts[room_time_key] += 1
-
-        return sum(count - 1 for count in conflicts.values() if count > 1)
+        # Every booking beyond the first of a (room, period) pair is a conflict.
+        bookings: List[Tuple[int, int]] = [
+            (room, period)
+            for room, slot in zip(self.room_genes, self.slot_genes)
+            if slot != UNPLACED
+            for period in slot_periods[slot]
+        ]
+        return len(bookings) - len(set(bookings))
 
     def _check_professor_conflicts(self) -> int:
-        conflicts: DefaultConfCounter = defaultdict(int)
-        for scheduled_class in self.raw_schedule:
-            professor_time_key = (
-                scheduled_class.professor.professor_id,
-                scheduled_class.time_slot.slot_id,
+        bookings: List[Tuple[int, int]] = [
+            (professor, period)
+            for professor, slot in zip(self.problem.session_professor, self.slot_genes)
+            if slot != UNPLACED
+            for period in slot_periods[slot]
+        ]
+        return len(bookings) - len(set(bookings))
+
+    def _check_student_conflicts(self) -> int:
+        # A lecture books every batch of its division, so it clashes with their labs.
+        bookings: List[Tuple[int, int]] = [
+            (group, period)
+            for groups, slot in zip(
+                self.problem.session_student_groups, self.slot_genes
             )
-            conflicts[professor_time_key] += 1
-
-        return sum(count - 1 for count in conflicts.values() if count > 1)
+            if slot != UNPLACED
+            for group in groups
+            for period in slot_periods[slot]
+        ]
+        return len(bookings) - len(set(bookings))
 
     def _check_lecture_conflicts(self) -> int:
-        counts: LecConfCounter = defaultdict(int)
-        conflicts: int = 0
-
-        for scheduled_class in self.raw_schedule:
-            if scheduled_class.time_slot.duration == TIME_SLOT_DURATION:
-                key = (
-                    scheduled_class.course.code,
-                    scheduled_class.course.weekly_lectures,
-                )
-                counts[key] += 1
-
-        for course, lectures in counts.items():
-            if lectures != course[1]:
-                conflicts += abs(lectures - course[1])
-
-        return conflicts
+        return self._check_session_counts(lab=False)
 
     def _check_lab_conflicts(self) -> int:
-        counts: LabConfCounter = defaultdict(lambda: defaultdict(int))
-        conflicts: int = 0
-
-        for scheduled_class in self.raw_schedule:
-            if scheduled_class.time_slot.duration == LAB_TIME_SLOT_DURATION:
-                batch: int = int(scheduled_class.batch.split()[-1])
-                key = (scheduled_class.course.code, scheduled_class.course.weekly_labs)
-                counts[key][batch] += 1
-
-        for (_, weekly_labs), batch_counts in counts.items():
-            for batch, labs in batch_counts.items():
-                if labs != weekly_labs:
-                    conflicts += abs(labs - weekly_labs)
-
-        return conflicts
+        return self._check_session_counts(lab=True)
+
+    def _check_session_counts(self, lab: bool) -> int:
+        counts: List[int] = [0] * len(self.problem.group_sizes)
+        for group, slot in zip(self.problem.session_group, self.slot_genes):
+            if slot != UNPLACED:
+                counts[group] += 1
+
+        return sum(
+            abs(required - count)
+            for required, count, is_lab in zip(
+                self.problem.group_sizes, counts, self.problem.group_is_lab
+            )
+            if is_lab == lab
+        )
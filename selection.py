@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from random import Random
+from typing import List, Sequence
+
+import numpy as np
+
+from constants import TOURNAMENT_SELECTION_SIZE
+
+# Type Aliases
+FitnessArray = np.ndarray
+Picks = np.ndarray
+
+
+class Selection(ABC):
+    """
+    Chooses parents by index from the fitness of a population.
+
+    `select` draws every parent of a generation in one vectorized call. Its random
+    numbers come from a NumPy generator seeded with a single draw from the run's
+    random stream, so a seeded run still picks the same parents.
+    """
+
+    def select(self, fitness: Sequence[float], count: int, rng: Random) -> List[int]:
+        """Indices into `fitness` of `count` parents, in the order they are to be paired."""
+        if not len(fitness):
+            raise ValueError("Expected a non-empty population")
+
+        generator: np.random.Generator = np.random.default_rng(rng.getrandbits(64))
+        return self._select(
+            np.asarray(fitness, dtype=np.float64), count, generator
+        ).tolist()
+
+    @abstractmethod
+    def _select(
+        self, fitness: FitnessArray, count: int, generator: np.random.Generator
+    ) -> Picks:
+        """Indices of `count` parents drawn from `generator` for a non-empty `fitness`."""
+
+
+class TournamentSelection(Selection):
+    """Each parent is the fittest of `size` schedules drawn at random (with replacement)."""
+
+    def __init__(self, size: int = TOURNAMENT_SELECTION_SIZE) -> None:
+        if not size > 0:
+            raise ValueError("Expected a positive tournament size")
+
+        self.size: int = size
+
+    def _select(
+        self, fitness: FitnessArray, count: int, generator: np.random.Generator
+    ) -> Picks:
+        entrants: Picks = generator.integers(0, len(fitness), (count, self.size))
+        return entrants[np.arange(count), fitness[entrants].argmax(axis=1)]
+
+
+class RouletteSelection(Selection):
+    """Each parent is drawn with probability proportional to its fitness."""
+
+    def _select(
+        self, fitness: FitnessArray, count: int, generator: np.random.Generator
+    ) -> Picks:
+        return _spin(self._weights(fitness), generator.random(count))
+
+    def _weights(self, fitness: FitnessArray) -> np.ndarray:
+        return np.clip(fitness, 0.0, None)
+
+
+class RankSelection(RouletteSelection):
+    """
+    Roulette over ranks instead of fitness: the fittest of n schedules weighs n, the
+    least fit 1. Pressure no longer fades once all fitness values are close together.
+    """
+
+    def _weights(self, fitness: FitnessArray) -> np.ndarray:
+        ranks: np.ndarray = np.empty(len(fitness), dtype=np.float64)
+        ranks[np.argsort(fitness, kind="stable")] = np.arange(1, len(fitness) + 1)
+        return ranks
+
+
+class StochasticUniversalSampling(RouletteSelection):
+    """
+    Roulette with `count` evenly spaced pointers and a single random offset, so every
+    schedule is picked within one of its expected number of times. The picks are
+    shuffled before they are paired.
+    """
+
+    def _select(
+        self, fitness: FitnessArray, count: int, generator: np.random.Generator
+    ) -> Picks:
+        pointers: np.ndarray = (generator.random() + np.arange(count)) / count
+        return generator.permutation(_spin(self._weights(fitness), pointers))
+
+
+def _spin(weights: np.ndarray, pointers: np.ndarray) -> Picks:
+    """Indices of the wheel sectors, sized by `weights`, that pointers in [0, 1) land on."""
+    wheel: np.ndarray = np.cumsum(weights)
+    if not wheel[-1] > 0.0:
+        # All weights are zero: every schedule is equally likely.
+        return (pointers * len(weights)).astype(np.int64)
+    picks: Picks = np.searchsorted(wheel, pointers * wheel[-1], side="right")
+    return np.minimum(picks, len(weights) - 1)
+
+
+def create_selection(
+    method: str, tournament_size: int = TOURNAMENT_SELECTION_SIZE
+) -> Selection:
+    """
+    Creates the parent selection of a run.
+
+    Args:
+        method (str): "tournament", "roulette", "rank" or "sus" (stochastic universal
+            sampling).
+        tournament_size (int): Schedules competing in each tournament.
+
+    Raises:
+        ValueError: If the method is not known.
+    """
+    if method == "tournament":
+        return TournamentSelection(tournament_size)
+    if method == "roulette":
+        return RouletteSelection()
+    if method == "rank":
+        return RankSelection()
+    if method == "sus":
+        return StochasticUniversalSampling()
+    raise ValueError(f"Unknown selection method '{method}'")
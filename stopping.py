@@ -0,0 +1,129 @@
+from timeit import default_timer as timer
+from typing import Optional
+
+from constants import (
+    GENERATIONS,
+    MAX_EVALUATIONS,
+    STAGNANCY_THRESHOLD,
+    TARGET_CONFLICTS,
+    TARGET_FITNESS,
+    TIME_BUDGET,
+)
+from schedule import hard_conflicts
+
+# Stop reasons reported by `RunController.stop_reason`.
+TARGET_REACHED: str = "Target fitness"
+CONFLICTS_REACHED: str = "Target conflicts"
+EVALUATIONS_EXHAUSTED: str = "Evaluation limit"
+TIME_EXHAUSTED: str = "Time budget"
+STAGNATED: str = "Stagnancy threshold"
+GENERATIONS_EXHAUSTED: str = "Generation limit"
+
+
+class RunController:
+    """
+    Decides when an evolution run stops.
+
+    A run stops as soon as any of its limits is met: the best schedule has at most
+    `target_conflicts` hard conflicts (0: it is feasible, whatever its soft
+    penalty), the best fitness reaches `target_fitness`, `max_evaluations`
+    schedules have been evaluated, `time_budget` seconds have passed since
+    `start`, the best fitness has not improved for `stagnancy_threshold`
+    consecutive generations, or `generations` generations have been evolved.
+    Limits set to None are ignored.
+
+    Attributes:
+        generations (int): Maximum number of generations.
+        time_budget (Optional[float]): Wall-clock seconds the run may take.
+        target_fitness (Optional[float]): Fitness at which the run is finished.
+        target_conflicts (Optional[int]): Hard conflicts at which the run is finished.
+        stagnancy_threshold (int): Consecutive generations allowed without improvement.
+        max_evaluations (Optional[int]): Maximum number of schedules evaluated.
+        evaluations (int): Schedules evaluated so far.
+        best_fitness (float): Best fitness seen so far, -1.0 before the first generation.
+        improved_at (int): Generation at which `best_fitness` was first reached.
+        stop_reason (Optional[str]): The limit that stopped the run, once it has.
+    """
+
+    def __init__(
+        self,
+        generations: int = GENERATIONS,
+        time_budget: Optional[float] = TIME_BUDGET,
+        target_fitness: Optional[float] = TARGET_FITNESS,
+        stagnancy_threshold: int = STAGNANCY_THRESHOLD,
+        max_evaluations: Optional[int] = MAX_EVALUATIONS,
+        target_conflicts: Optional[int] = TARGET_CONFLICTS,
+    ) -> None:
+        if not generations >= 0:
+            raise ValueError("Expected a non-negative number of generations")
+        if time_budget is not None and not time_budget > 0.0:
+            raise ValueError("Expected a positive time budget")
+        if not stagnancy_threshold > 0:
+            raise ValueError("Expected a positive stagnancy threshold")
+        if max_evaluations is not None and not max_evaluations > 0:
+            raise ValueError("Expected a positive evaluation limit")
+        if target_conflicts is not None and not target_conflicts >= 0:
+            raise ValueError("Expected a non-negative target conflict count")
+
+        self.generations: int = generations
+        self.time_budget: Optional[float] = time_budget
+        self.target_fitness: Optional[float] = target_fitness
+        self.stagnancy_threshold: int = stagnancy_threshold
+        self.max_evaluations: Optional[int] = max_evaluations
+        self.target_conflicts: Optional[int] = target_conflicts
+        self.start()
+
+    def start(self) -> None:
+        """Starts the clock and clears the counters of a previous run."""
+        self.evaluations: int = 0
+        self.best_fitness: float = -1.0
+        self.improved_at: int = 0
+        self.stop_reason: Optional[str] = None
+        self._started: float = timer()
+
+    def restore(
+        self, evaluations: int, best_fitness: float, improved_at: int, elapsed: float
+    ) -> None:
+        """Continues a run saved after `elapsed` seconds with the given counters."""
+        self.start()
+        self.evaluations = evaluations
+        self.best_fitness = best_fitness
+        self.improved_at = improved_at
+        self._started -= elapsed
+
+    @property
+    def elapsed(self) -> float:
+        return timer() - self._started
+
+    def add_evaluations(self, count: int) -> None:
+        self.evaluations += count
+
+    def should_stop(self, generation: int, best_fitness: float) -> bool:
+        """
+        Records the best fitness after `generation` evolved generations and tells whether
+        the run is over; if so, `stop_reason` names the limit that was met.
+        """
+        if best_fitness > self.best_fitness:
+            self.best_fitness = best_fitness
+            self.improved_at = generation
+
+        if (
+            self.target_conflicts is not None
+            and best_fitness > 0.0
+            and hard_conflicts(best_fitness) <= self.target_conflicts
+        ):
+            self.stop_reason = CONFLICTS_REACHED
+        elif self.target_fitness is not None and best_fitness >= self.target_fitness:
+            self.stop_reason = TARGET_REACHED
+        elif (
+            self.max_evaluations is not None
+            and self.evaluations >= self.max_evaluations
+        ):
+            self.stop_reason = EVALUATIONS_EXHAUSTED
+        elif self.time_budget is not None and self.elapsed >= self.time_budget:
+            self.stop_reason = TIME_EXHAUSTED
+        elif generation - self.improved_at >= self.stagnancy_threshold:
+            self.stop_reason = STAGNATED
+        elif generation >= self.generations:
+            self.stop_reason = GENERATIONS_EXHAUSTED
+        return self.stop_reason is not None
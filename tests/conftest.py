@@ -0,0 +1,25 @@
+from pathlib import Path
+from random import Random
+
+import pytest
+
+from constraints import ConsecutiveHours, CourseRepeats, LabPlacement, ProfessorGaps
+from data import load_data
+from problem import ProblemInstance
+
+INPUT_PATH: Path = Path(__file__).resolve().parent.parent / "input.json"
+
+
+@pytest.fixture(scope="session")
+def problem() -> ProblemInstance:
+    """`input.json` with every built-in soft constraint weighted."""
+    return load_data(
+        str(INPUT_PATH),
+        Random(0),
+        soft_constraints=[
+            ProfessorGaps(2),
+            ConsecutiveHours(3, limit=1),
+            CourseRepeats(5),
+            LabPlacement(7),
+        ],
+    )
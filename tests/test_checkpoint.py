@@ -0,0 +1,63 @@
+from pathlib import Path
+from random import Random
+from typing import Optional, Tuple
+
+import app
+from checkpoint import Checkpoint, load_checkpoint
+from constants import CROSSOVER_RATE
+from fitness_cache import FitnessCache
+from genetic_alg import EvolutionManager, Population, SchedFactory
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer
+from stopping import RunController
+
+GENERATIONS: int = 25
+CHECKPOINT_INTERVAL: int = 10
+
+
+class RecordingManager(EvolutionManager):
+    """Keeps the last population it evolved, which `app.evolve` does not return."""
+
+    population: Optional[Population] = None
+
+    def evolve(
+        self, population: Population, schedule_factory: SchedFactory
+    ) -> Population:
+        self.population = super().evolve(population, schedule_factory)
+        return self.population
+
+
+def run(problem: ProblemInstance, path: Path, resume: bool) -> Tuple[bytes, int, float]:
+    """Genes of the final population, evaluations and best fitness of a seeded run."""
+    rng = Random(7)
+    run_controller = RunController(
+        generations=GENERATIONS, stagnancy_threshold=1000, target_conflicts=None
+    )
+    manager = RecordingManager(
+        0.3, CROSSOVER_RATE, rng=rng, fitness_cache=FitnessCache(500)
+    )
+    resume_from: Optional[Checkpoint] = (
+        load_checkpoint(str(path), problem, rng) if resume else None
+    )
+    app.evolve(
+        manager,
+        lambda: ScheduleOptimizer(problem, rng),
+        run_controller,
+        checkpoint_path=None if resume else str(path),
+        checkpoint_interval=CHECKPOINT_INTERVAL,
+        resume_from=resume_from,
+    )
+    genes: bytes = b"".join(
+        schedule.slot_genes.tobytes() + schedule.room_genes.tobytes()
+        for schedule in manager.population.schedules
+    )
+    return genes, run_controller.evaluations, run_controller.best_fitness
+
+
+def test_resumed_run_matches_uninterrupted_run(
+    problem: ProblemInstance, tmp_path: Path
+) -> None:
+    path: Path = tmp_path / "run.npz"
+    uninterrupted = run(problem, path, resume=False)
+    assert path.exists()
+    assert run(problem, path, resume=True) == uninterrupted
@@ -0,0 +1,72 @@
+from random import Random
+from typing import List, Tuple
+
+import pytest
+
+from evaluation import batch_evaluator
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer, hard_conflicts
+from timeslots import slot_periods, time_slots
+
+# Monday 09:30-10:30 and Monday 08:30-10:30 share the 09:30 period.
+LECTURE_SLOT: int = 2
+LAB_SLOT: int = 1
+# Monday 10:30-12:30, clear of the lecture.
+CLEAR_LAB_SLOT: int = 5
+
+
+def session_pair(problem: ProblemInstance, same_professor: bool) -> Tuple[int, int]:
+    """A lecture and a lab without common students, taught by one or two professors."""
+    lectures: List[int] = [
+        index for index, session in enumerate(problem.sessions) if not session.is_lab
+    ]
+    labs: List[int] = [
+        index for index, session in enumerate(problem.sessions) if session.is_lab
+    ]
+    return next(
+        (lecture, lab)
+        for lecture in lectures
+        for lab in labs
+        if (problem.session_professor[lecture] == problem.session_professor[lab])
+        == same_professor
+        and not set(problem.session_student_groups[lecture])
+        & set(problem.session_student_groups[lab])
+    )
+
+
+def place(
+    problem: ProblemInstance, lecture: int, lab: int, lab_slot: int, same_room: bool
+) -> ScheduleOptimizer:
+    """A schedule holding only `lecture` at `LECTURE_SLOT` and `lab` at `lab_slot`."""
+    schedule = ScheduleOptimizer(problem, Random(0))
+    schedule.move_session(lecture, LECTURE_SLOT, 0)
+    schedule.move_session(lab, lab_slot, 0 if same_room else 1)
+    return schedule
+
+
+def test_slots_overlap() -> None:
+    assert time_slots[LECTURE_SLOT].duration < time_slots[LAB_SLOT].duration
+    assert len(set(slot_periods[LECTURE_SLOT]) & set(slot_periods[LAB_SLOT])) == 1
+    assert not set(slot_periods[LECTURE_SLOT]) & set(slot_periods[CLEAR_LAB_SLOT])
+
+
+@pytest.mark.parametrize(
+    "same_professor, same_room", [(True, False), (False, True), (True, True)]
+)
+def test_overlapping_lecture_and_lab_clash(
+    problem: ProblemInstance, same_professor: bool, same_room: bool
+) -> None:
+    lecture, lab = session_pair(problem, same_professor)
+    clear = place(problem, lecture, lab, CLEAR_LAB_SLOT, same_room)
+    overlapping = place(problem, lecture, lab, LAB_SLOT, same_room)
+
+    # The slots share one period: one clash per resource booked twice in it.
+    clashes: int = same_professor + same_room
+    assert (
+        hard_conflicts(overlapping.fitness) == hard_conflicts(clear.fitness) + clashes
+    )
+    batch: List[float] = batch_evaluator(problem).evaluate([clear, overlapping])
+    assert [hard_conflicts(fitness) for fitness in batch] == [
+        hard_conflicts(clear.fitness),
+        hard_conflicts(overlapping.fitness),
+    ]
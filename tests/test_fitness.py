@@ -0,0 +1,164 @@
+from random import Random
+from typing import List, Optional, Set, Tuple
+
+from constants import CROSSOVER_RATE
+from evaluation import batch_evaluator
+from fitness_cache import FitnessCache, genome_hash
+from genetic_alg import EvolutionManager, Population
+from problem import ProblemInstance
+from schedule import (
+    UNPLACED,
+    Occupancy,
+    Placement,
+    ScheduleOptimizer,
+    fitness_from_scores,
+)
+from timeslots import slot_periods, time_slots
+
+
+def random_target(problem: ProblemInstance, rng: Random) -> Tuple[int, int, int]:
+    """A random (session, slot, room), overlapping bookings and `UNPLACED` included."""
+    index: int = rng.randrange(len(problem.sessions))
+    slot: int = rng.choice([UNPLACED, *range(len(time_slots))])
+    if slot == UNPLACED:
+        return index, UNPLACED, UNPLACED
+    return index, slot, rng.randrange(len(problem.all_rooms))
+
+
+def random_move(schedule: ScheduleOptimizer, rng: Random) -> None:
+    schedule.move_session(*random_target(schedule.problem, rng))
+
+
+def rebuilt_occupancy(schedule: ScheduleOptimizer) -> Occupancy:
+    """`Occupancy` tables built afresh from the genes alone."""
+    return ScheduleOptimizer.from_genes(
+        schedule.problem,
+        schedule.rng,
+        schedule.slot_genes.tobytes(),
+        schedule.room_genes.tobytes(),
+    ).occupancy
+
+
+def rebuilt_fitness(schedule: ScheduleOptimizer) -> float:
+    occupancy: Occupancy = rebuilt_occupancy(schedule)
+    return fitness_from_scores(occupancy.conflicts, occupancy.penalty)
+
+
+def test_fitness_paths_agree(problem: ProblemInstance) -> None:
+    rng = Random(1)
+    schedules: List[ScheduleOptimizer] = []
+    for _ in range(40):
+        schedule: ScheduleOptimizer = ScheduleOptimizer(problem, rng).create_schedule()
+        for _ in range(rng.randrange(60)):
+            random_move(schedule, rng)
+        schedules.append(schedule)
+
+    batch: List[float] = batch_evaluator(problem).evaluate(schedules)
+    assert batch == [schedule.calculate_fitness() for schedule in schedules]
+    assert batch == [schedule.fitness for schedule in schedules]
+    assert batch == [rebuilt_fitness(schedule) for schedule in schedules]
+
+
+def test_move_fitness_matches_move_session(problem: ProblemInstance) -> None:
+    rng = Random(2)
+    for _ in range(5):
+        schedule: ScheduleOptimizer = ScheduleOptimizer(problem, rng).create_schedule()
+        for _ in range(300):
+            index, slot, room = random_target(problem, rng)
+            predicted: float = schedule.move_fitness(index, slot, room)
+            assert schedule.move_session(index, slot, room) == predicted
+        assert schedule.fitness == schedule.calculate_fitness()
+
+
+def test_genome_hash_is_incremental(problem: ProblemInstance) -> None:
+    rng = Random(3)
+    for _ in range(10):
+        schedule: ScheduleOptimizer = ScheduleOptimizer(problem, rng).create_schedule()
+        schedule.genome_hash  # Computed once, then kept current by every move.
+        for _ in range(100):
+            random_move(schedule, rng)
+        assert schedule.genome_hash == genome_hash(
+            schedule.slot_genes, schedule.room_genes
+        )
+
+        twin: ScheduleOptimizer = schedule.clone()
+        random_move(twin, rng)
+        assert twin.genome_hash == genome_hash(twin.slot_genes, twin.room_genes)
+        assert schedule.genome_hash == genome_hash(
+            schedule.slot_genes, schedule.room_genes
+        )
+
+
+def evolved_genes(
+    problem: ProblemInstance, fitness_cache: Optional[FitnessCache]
+) -> List[bytes]:
+    """Genes of a seeded 15-generation run."""
+    rng = Random(4)
+    factory = lambda: ScheduleOptimizer(problem, rng)
+    manager = EvolutionManager(
+        0.3, CROSSOVER_RATE, rng=rng, fitness_cache=fitness_cache
+    )
+    population = Population(30, factory)
+    for _ in range(15):
+        population = manager.evolve(population, factory)
+    return [
+        schedule.slot_genes.tobytes() + schedule.room_genes.tobytes()
+        for schedule in population.schedules
+    ]
+
+
+def test_fitness_cache_does_not_change_the_run(problem: ProblemInstance) -> None:
+    fitness_cache = FitnessCache()
+    assert evolved_genes(problem, fitness_cache) == evolved_genes(problem, None)
+    assert fitness_cache.hits > 0
+
+
+def clashing_pairs(schedule: ScheduleOptimizer) -> List[int]:
+    """Placed sessions sharing a room, professor or student group period, pair by pair."""
+    problem: ProblemInstance = schedule.problem
+    bookings: List[Tuple[int, Set[int], int]] = [
+        (index, set(slot_periods[slot]), room)
+        for index, (slot, room) in enumerate(
+            zip(schedule.slot_genes, schedule.room_genes)
+        )
+        if slot != UNPLACED
+    ]
+    clashing: Set[int] = set()
+    for index, periods, room in bookings:
+        for other, other_periods, other_room in bookings:
+            if other <= index or not periods & other_periods:
+                continue
+            if (
+                room == other_room
+                or problem.session_professor[index] == problem.session_professor[other]
+                or set(problem.session_student_groups[index])
+                & set(problem.session_student_groups[other])
+            ):
+                clashing |= {index, other}
+    return sorted(clashing)
+
+
+def test_conflicting_sessions_match_a_full_scan(problem: ProblemInstance) -> None:
+    rng = Random(5)
+    parent: ScheduleOptimizer = ScheduleOptimizer(problem, rng).create_schedule()
+    for _ in range(5):
+        schedule: ScheduleOptimizer = ScheduleOptimizer(problem, rng).create_schedule()
+        for move in range(200):
+            if rng.random() < 0.5:
+                random_move(schedule, rng)  # Often into a clash.
+            else:
+                index: int = rng.randrange(len(problem.sessions))
+                placement: Optional[Placement] = schedule.random_placement(index)
+                if placement is not None:
+                    schedule.move_session(index, *placement)
+            if move % 10 == 0:
+                assert schedule.conflicting_sessions() == clashing_pairs(schedule)
+
+        # Repair leaves its own list behind, as crossover offspring get it.
+        offspring: ScheduleOptimizer = ScheduleOptimizer(problem, rng)
+        offspring.inherit(schedule)
+        for start, stop in problem.session_blocks:
+            if rng.random() < 0.5:
+                offspring.inherit(parent, start, stop)
+        offspring.repair()
+        assert offspring.conflicting_sessions() == clashing_pairs(offspring)
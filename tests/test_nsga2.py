@@ -0,0 +1,44 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+import nsga2
+from nsga2 import non_dominated_sort
+
+
+def brute_force_ranks(objectives: np.ndarray) -> List[int]:
+    """Pareto ranks by repeatedly removing the rows no remaining row dominates."""
+    ranks: List[int] = [-1] * len(objectives)
+    remaining = set(range(len(objectives)))
+    rank: int = 0
+    while remaining:
+        front = [
+            row
+            for row in remaining
+            if not any(
+                (objectives[other] <= objectives[row]).all()
+                and (objectives[other] < objectives[row]).any()
+                for other in remaining
+            )
+        ]
+        for row in front:
+            ranks[row] = rank
+        remaining -= set(front)
+        rank += 1
+    return ranks
+
+
+@pytest.mark.parametrize("block", [nsga2.NSGA2_SORT_BLOCK, 7])
+def test_non_dominated_sort_matches_brute_force(
+    monkeypatch: pytest.MonkeyPatch, block: int
+) -> None:
+    # A small block splits the domination matrix into several, the last one partial.
+    monkeypatch.setattr(nsga2, "NSGA2_SORT_BLOCK", block)
+    generator = np.random.default_rng(0)
+    for _ in range(100):
+        # Few distinct values, so ties and duplicate rows are common.
+        objectives: np.ndarray = generator.integers(
+            0, 6, (generator.integers(1, 80), generator.integers(1, 5))
+        )
+        assert non_dominated_sort(objectives).tolist() == brute_force_ranks(objectives)
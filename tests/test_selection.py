@@ -0,0 +1,63 @@
+from math import ceil, floor
+from random import Random
+from typing import List
+
+import pytest
+
+from selection import Selection, TournamentSelection, create_selection
+
+METHODS: List[str] = ["tournament", "roulette", "rank", "sus"]
+FITNESS: List[float] = [0.02, 0.5, 0.1, 0.0, 0.25, 0.1, 0.03]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_picks_are_valid_and_seeded(method: str) -> None:
+    selection: Selection = create_selection(method)
+    rng = Random(3)
+    picks: List[int] = selection.select(FITNESS, 40, rng)
+    assert len(picks) == 40
+    assert all(0 <= pick < len(FITNESS) for pick in picks)
+
+    # The same seed gives the same picks, and the run's stream advances by one draw.
+    assert selection.select(FITNESS, 40, Random(3)) == picks
+    stream = Random(3)
+    stream.getrandbits(64)
+    assert rng.getstate() == stream.getstate()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_zero_fitness_population(method: str) -> None:
+    picks: List[int] = create_selection(method).select([0.0] * 5, 20, Random(0))
+    assert all(0 <= pick < 5 for pick in picks)
+
+
+def test_tournament_larger_than_population() -> None:
+    # Entrants are drawn with replacement, so a tournament can outnumber the
+    # population; with 500 entrants out of 3 the fittest is all but sure to enter.
+    picks: List[int] = TournamentSelection(500).select([0.2, 0.6, 0.4], 30, Random(1))
+    assert picks == [1] * 30
+
+
+def test_roulette_never_picks_zero_fitness() -> None:
+    picks: List[int] = create_selection("roulette").select(FITNESS, 500, Random(2))
+    assert FITNESS.index(0.0) not in picks
+
+
+def test_stochastic_universal_sampling_spread() -> None:
+    count: int = 100
+    picks: List[int] = create_selection("sus").select(FITNESS, count, Random(4))
+    total: float = sum(FITNESS)
+    for index, fitness in enumerate(FITNESS):
+        expected: float = fitness / total * count
+        assert floor(expected) <= picks.count(index) <= ceil(expected)
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        create_selection("tournament").select([], 2, Random(0))
+    with pytest.raises(ValueError):
+        TournamentSelection(0)
+    with pytest.raises(ValueError):
+        create_selection("lottery")
+    with pytest.raises(TypeError):
+        Selection()
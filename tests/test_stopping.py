@@ -0,0 +1,149 @@
+from pathlib import Path
+from random import Random
+
+import pytest
+
+import stopping
+from checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+from genetic_alg import SchedulePool
+from problem import ProblemInstance
+from schedule import ScheduleOptimizer, fitness_from_scores
+from stopping import (
+    CONFLICTS_REACHED,
+    EVALUATIONS_EXHAUSTED,
+    GENERATIONS_EXHAUSTED,
+    STAGNATED,
+    TARGET_REACHED,
+    TIME_EXHAUSTED,
+    RunController,
+)
+
+
+class Clock:
+    """Stands in for `stopping.timer`, moving only when told to."""
+
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(stopping, "timer", clock)
+    return clock
+
+
+def controller(**limits: object) -> RunController:
+    """A controller with only the given limits; the others never stop a run."""
+    settings = {
+        "generations": 1000,
+        "target_conflicts": None,
+        "stagnancy_threshold": 1000,
+        **limits,
+    }
+    return RunController(**settings)
+
+
+def test_time_budget(clock: Clock) -> None:
+    run_controller = controller(time_budget=5.0)
+    clock.now += 4.0
+    assert not run_controller.should_stop(1, 0.1)
+    clock.now += 1.0
+    assert run_controller.should_stop(2, 0.1)
+    assert run_controller.stop_reason == TIME_EXHAUSTED
+
+
+def test_target_conflicts() -> None:
+    run_controller = controller(target_conflicts=0)
+    assert not run_controller.should_stop(1, fitness_from_scores(1, 0))
+    # Feasible, however large the soft penalty.
+    assert run_controller.should_stop(2, fitness_from_scores(0, 500))
+    assert run_controller.stop_reason == CONFLICTS_REACHED
+
+    run_controller = controller(target_conflicts=3)
+    assert not run_controller.should_stop(1, fitness_from_scores(4, 9))
+    assert run_controller.should_stop(2, fitness_from_scores(3, 9))
+
+
+def test_target_fitness() -> None:
+    run_controller = controller(target_fitness=1.0)
+    assert not run_controller.should_stop(1, fitness_from_scores(0, 1))
+    assert run_controller.should_stop(2, fitness_from_scores(0, 0))
+    assert run_controller.stop_reason == TARGET_REACHED
+
+
+def test_stagnancy_threshold() -> None:
+    run_controller = controller(stagnancy_threshold=3)
+    assert not run_controller.should_stop(1, 0.2)
+    assert not run_controller.should_stop(2, 0.2)
+    assert not run_controller.should_stop(3, 0.1)
+    assert run_controller.should_stop(4, 0.2)
+    assert run_controller.stop_reason == STAGNATED
+    assert run_controller.improved_at == 1
+
+
+def test_evaluation_limit() -> None:
+    run_controller = controller(max_evaluations=100)
+    run_controller.add_evaluations(60)
+    assert not run_controller.should_stop(1, 0.1)
+    run_controller.add_evaluations(40)
+    assert run_controller.should_stop(2, 0.1)
+    assert run_controller.stop_reason == EVALUATIONS_EXHAUSTED
+
+
+def test_generation_limit() -> None:
+    run_controller = controller(generations=2)
+    assert not run_controller.should_stop(1, 0.1)
+    assert run_controller.should_stop(2, 0.1)
+    assert run_controller.stop_reason == GENERATIONS_EXHAUSTED
+
+
+def test_checkpoint_round_trip(
+    problem: ProblemInstance, tmp_path: Path, clock: Clock
+) -> None:
+    rng = Random(8)
+    schedules: SchedulePool = [
+        ScheduleOptimizer(problem, rng).create_schedule() for _ in range(4)
+    ]
+    best: float = max(schedule.fitness for schedule in schedules)
+    run_controller = controller(time_budget=60.0, stagnancy_threshold=5)
+    run_controller.add_evaluations(250)
+    for generation in range(1, 4):
+        assert not run_controller.should_stop(generation, best)
+    clock.now += 20.0
+
+    path: Path = tmp_path / "run.npz"
+    save_checkpoint(str(path), 4, schedules, run_controller, rng)
+    checkpoint: Checkpoint = load_checkpoint(str(path), problem, rng)
+    resumed = controller(time_budget=60.0, stagnancy_threshold=5)
+    clock.now += 1000.0  # Time between the two runs does not count.
+    resumed.restore(
+        checkpoint.evaluations,
+        checkpoint.best_fitness,
+        checkpoint.improved_at,
+        checkpoint.elapsed,
+    )
+
+    assert checkpoint.generation == 4
+    assert resumed.evaluations == 250
+    assert resumed.best_fitness == best
+    assert resumed.improved_at == 1
+    assert resumed.elapsed == 20.0
+    # Both the stagnancy count and the clock carry on from where the run was saved.
+    assert not resumed.should_stop(5, best)
+    assert resumed.should_stop(6, best)
+    assert resumed.stop_reason == STAGNATED
+
+    resumed = controller(time_budget=60.0)
+    resumed.restore(
+        checkpoint.evaluations,
+        checkpoint.best_fitness,
+        checkpoint.improved_at,
+        checkpoint.elapsed,
+    )
+    clock.now += 40.0  # 20 seconds before the checkpoint, 40 after it.
+    assert resumed.should_stop(5, best)
+    assert resumed.stop_reason == TIME_EXHAUSTED
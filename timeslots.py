@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bitset import mask_of
+from constants import (
+    DAYS_OF_WEEK,
+    LAB_TIME_SLOT_DURATION,
+    LUNCH_BREAK_END,
+    LUNCH_BREAK_START,
+    TIME_SLOT_DURATION,
+    UNIVERSITY_END_TIME,
+    UNIVERSITY_START_TIME,
+)
+from models import TimeSlot
+
+# The slot catalog of the university week. Slots get dense, deterministic ids equal
+# to their position in `time_slots`, which is also the value stored in slot genes.
+#
+# Lectures and labs starting at the same time are distinct slots that overlap in
+# wall-clock time, so clashes are checked on atomic periods instead: the day is cut
+# into TIME_SLOT_DURATION periods from UNIVERSITY_START_TIME, and `slot_periods`
+# lists the periods each slot covers. Two bookings clash when they share a period.
+
+# Type Aliases
+TimeSlots = List[TimeSlot]
+SlotKey = Tuple[str, datetime, timedelta]
+PeriodTable = Tuple[Tuple[int, ...], ...]
+
+# Nullable Types
+NullableSlot = Optional[int]
+
+
+def create_timeslots() -> TimeSlots:
+    populated_time_slots: TimeSlots = []
+
+    for day in DAYS_OF_WEEK:
+        current_time: datetime = UNIVERSITY_START_TIME
+        while current_time + TIME_SLOT_DURATION <= UNIVERSITY_END_TIME:
+            if LUNCH_BREAK_START <= current_time < LUNCH_BREAK_END:
+                current_time += TIME_SLOT_DURATION
+                continue
+
+            populated_time_slots.append(
+                TimeSlot(
+                    slot_id=len(populated_time_slots),
+                    day=day,
+                    start=current_time,
+                    duration=TIME_SLOT_DURATION,
+                )
+            )
+
+            if current_time + LAB_TIME_SLOT_DURATION <= UNIVERSITY_END_TIME:
+                populated_time_slots.append(
+                    TimeSlot(
+                        slot_id=len(populated_time_slots),
+                        day=day,
+                        start=current_time,
+                        duration=LAB_TIME_SLOT_DURATION,
+                    )
+                )
+
+            current_time += TIME_SLOT_DURATION
+
+    return populated_time_slots
+
+
+def covered_periods(slot: TimeSlot) -> Tuple[int, ...]:
+    """Returns the atomic periods of the week that `slot` overlaps."""
+    first: int = (slot.start - UNIVERSITY_START_TIME) // TIME_SLOT_DURATION
+    last: int = -((UNIVERSITY_START_TIME - slot.end) // TIME_SLOT_DURATION)
+    day_offset: int = DAYS_OF_WEEK.index(slot.day) * periods_per_day
+    return tuple(day_offset + period for period in range(first, last))
+
+
+time_slots: TimeSlots = create_timeslots()
+periods_per_day: int = -(
+    (UNIVERSITY_START_TIME - UNIVERSITY_END_TIME) // TIME_SLOT_DURATION
+)
+num_days: int = len(DAYS_OF_WEEK)
+num_periods: int = periods_per_day * num_days
+slot_periods: PeriodTable = tuple(covered_periods(slot) for slot in time_slots)
+max_slot_periods: int = max(len(periods) for periods in slot_periods)
+slot_days: Tuple[int, ...] = tuple(DAYS_OF_WEEK.index(slot.day) for slot in time_slots)
+slot_period_masks: Tuple[int, ...] = tuple(mask_of(periods) for periods in slot_periods)
+period_slots: Tuple[int, ...] = tuple(
+    mask_of(
+        slot_id for slot_id, periods in enumerate(slot_periods) if period in periods
+    )
+    for period in range(num_periods)
+)
+
+lecture_slot_ids: List[int] = [
+    index
+    for index, slot in enumerate(time_slots)
+    if slot.duration == TIME_SLOT_DURATION
+]
+lab_slot_ids: List[int] = [
+    index
+    for index, slot in enumerate(time_slots)
+    if slot.duration == LAB_TIME_SLOT_DURATION
+]
+lecture_slot_mask: int = mask_of(lecture_slot_ids)
+lab_slot_mask: int = mask_of(lab_slot_ids)
+slot_lookup: Dict[SlotKey, int] = {
+    (slot.day, slot.start, slot.duration): index
+    for index, slot in enumerate(time_slots)
+}
+
+
+def shifted_slot(slot_index: int, offset: timedelta) -> NullableSlot:
+    """Returns the slot of the same day and duration starting `offset` later, if any."""
+    slot: TimeSlot = time_slots[slot_index]
+    return slot_lookup.get((slot.day, slot.start + offset, slot.duration))
+
+
+def blocked_slots(busy_periods: int) -> int:
+    """Returns the bitset of slots overlapping any period of the `busy_periods` bitset."""
+    blocked: int = 0
+    while busy_periods:
+        lowest: int = busy_periods & -busy_periods
+        blocked |= period_slots[lowest.bit_length() - 1]
+        busy_periods ^= lowest
+    return blocked